@@ -5,44 +5,244 @@
 
 """Generate a formatted commit log and write it to a file.
 
-Usage: python get_commit_log.py <last_version> <output_file>
+Usage: python get_commit_log.py <last_version> <output_file> [--group] [--json] [--types <file>]
+
+Commits are streamed from `git log --reverse`, oldest first, and each one is
+written as soon as it is read, so long histories never sit in memory.
+
+With `--group`, commits are grouped by conventional commit type into
+features, fixes, performance, and everything else. With `--json`, a list of
+`{hash, short_hash, subject, type, scope, breaking}` objects is also written
+to `<output_file>.json`.
+
+The `--types` file, if it exists, is a json object mapping commit hashes to a
+conventional commit prefix like `"feat"` or `"fix(docs)!"`, which is used
+instead of the one in the subject. It is only read, so commits are
+reclassified by adding them there by hand.
 """
 
 from __future__ import annotations
 
+import argparse
+import contextlib
+import json
+import os
+import re
 import subprocess
 import sys
+from pathlib import Path
+from typing import IO, TYPE_CHECKING
+
+if TYPE_CHECKING:
+	from collections.abc import Iterator
+
+CONVENTIONAL_PATTERN: re.Pattern[str] = re.compile(
+	r"^(?P<type>[A-Za-z]+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?: "
+)
+"matches the `type(scope)!: ` prefix of a conventional commit subject"
+
+GROUPS: dict[str, str] = {
+	"feat": "Features",
+	"fix": "Fixes",
+	"perf": "Performance",
+	"other": "Other",
+}
+"heading for each group with `--group`, in order. unlisted types go in `other`"
+
+FIELD_SEP: str = "\x1f"
+"separates fields in our `git log` format, can't appear in a subject"
+
+
+def classify(subject: str) -> tuple[str, str | None, bool]:
+	"`(type, scope, breaking)` of a commit subject, with type `other` if it is not a conventional commit"
+	match: re.Match[str] | None = CONVENTIONAL_PATTERN.match(subject)
+	if match is None:
+		return "other", None, False
+	return (
+		match.group("type").lower(),
+		match.group("scope"),
+		bool(match.group("breaking")),
+	)
+
+
+def group_of(commit_type: str) -> str:
+	"key in `GROUPS` for a commit type"
+	return commit_type if commit_type in GROUPS else "other"
+
+
+def iter_commits(last_version: str) -> Iterator[tuple[str, str, str]]:
+	"""stream `(hash, short_hash, subject)` for each commit since *last_version*, oldest first
+
+	raises `subprocess.CalledProcessError` if git fails
+	"""
+	log_cmd: list[str] = [
+		"git",
+		"log",
+		"--reverse",
+		f"{last_version}..HEAD",
+		f"--pretty=format:%H{FIELD_SEP}%h{FIELD_SEP}%s",
+	]
+	with subprocess.Popen(  # noqa: S603
+		log_cmd,
+		stdout=subprocess.PIPE,
+		encoding="utf-8",
+		errors="replace",
+	) as proc:
+		assert proc.stdout is not None
+		for line in proc.stdout:
+			commit_hash, short_hash, subject = line.rstrip("\n").split(FIELD_SEP, 2)
+			yield commit_hash, short_hash, subject
+	if proc.returncode:
+		raise subprocess.CalledProcessError(proc.returncode, log_cmd)
+
+
+def read_overrides(types_file: Path | None) -> dict[str, str]:
+	"conventional commit prefixes by hash from *types_file*, empty if there is none"
+	if types_file is None or not types_file.is_file():
+		return {}
+	with open(types_file, encoding="utf-8") as f:
+		return json.load(f)
+
+
+def tmp_path(path: Path) -> Path:
+	"a temp file next to *path*, to write and then rename into place"
+	return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+def write_commits(
+	f: IO[str],
+	json_file: IO[str] | None,
+	last_version: str,
+	group: bool,
+	overrides: dict[str, str],
+) -> None:
+	"""stream the commits since *last_version* to *f*, and as json to *json_file* if given
+
+	commits in *overrides* are classified by the prefix there, instead of their subject
+	"""
+	# only buffered with `group`, since groups are written one after another
+	grouped: dict[str, list[str]] = {key: [] for key in GROUPS}
+	if json_file is not None:
+		_ = json_file.write("[")
+
+	for i, (commit_hash, short_hash, subject) in enumerate(iter_commits(last_version)):
+		entry: str = f"- {subject} ({short_hash})"
+		if not group and json_file is None:
+			_ = f.write(f"\n{entry}" if i else entry)
+			continue
+
+		commit_type: str
+		scope: str | None
+		breaking: bool
+		override: str | None = overrides.get(commit_hash)
+		commit_type, scope, breaking = classify(
+			subject if override is None else f"{override}: "
+		)
+
+		if group:
+			grouped[group_of(commit_type)].append(entry)
+		else:
+			_ = f.write(f"\n{entry}" if i else entry)
+
+		if json_file is not None:
+			record: dict[str, str | bool | None] = {
+				"hash": commit_hash,
+				"short_hash": short_hash,
+				"subject": subject,
+				"type": commit_type,
+				"scope": scope,
+				"breaking": breaking,
+			}
+			_ = json_file.write(("," if i else "") + "\n\t" + json.dumps(record))
+
+	if group:
+		# no markdown `#` headings, `git tag -F` would strip them as comments
+		_ = f.write(
+			"\n\n".join(
+				f"{GROUPS[key]}:\n" + "\n".join(entries)
+				for key, entries in grouped.items()
+				if entries
+			)
+		)
+	if json_file is not None:
+		_ = json_file.write("\n]\n")
 
 
 def main(
 	last_version: str,
 	commit_log_file: str,
+	group: bool = False,
+	json_output: bool = False,
+	types_file: Path | None = None,
 ) -> None:
-	"pretty print a commit log amd wrote it to a file"
+	"""pretty print a commit log and write it to a file, see module docstring
+
+	the outputs are written to temp files, and only renamed into place once git
+	succeeds, so a failure leaves the previous ones untouched
+	"""
 	if last_version == "NULL":
 		print("!!! ERROR !!!", file=sys.stderr)
 		print("LAST_VERSION is NULL, can't get commit log!", file=sys.stderr)
 		sys.exit(1)
 
+	overrides: dict[str, str] = read_overrides(types_file)
+	outputs: list[Path] = [Path(commit_log_file)]
+	if json_output:
+		outputs.append(Path(commit_log_file + ".json"))
+	tmps: list[Path] = [tmp_path(path) for path in outputs]
+
+	ok: bool = False
 	try:
-		log_cmd: list[str] = [
-			"git",
-			"log",
-			f"{last_version}..HEAD",
-			"--pretty=format:- %s (%h)",
-		]
-		commits: list[str] = (
-			subprocess.check_output(log_cmd).decode("utf-8").strip().split("\n")  # noqa: S603
-		)
-		with open(commit_log_file, "w") as f:
-			_ = f.write("\n".join(reversed(commits)))
+		with contextlib.ExitStack() as stack:
+			files: list[IO[str]] = [
+				stack.enter_context(tmp.open("w", encoding="utf-8")) for tmp in tmps
+			]
+			write_commits(
+				files[0],
+				files[1] if json_output else None,
+				last_version,
+				group,
+				overrides,
+			)
+		ok = True
 	except subprocess.CalledProcessError as e:
 		print(f"Error: {e}", file=sys.stderr)
+	finally:
+		for tmp, path in zip(tmps, outputs):
+			if ok:
+				tmp.replace(path)
+			else:
+				tmp.unlink(missing_ok=True)
+	if not ok:
 		sys.exit(1)
 
 
 if __name__ == "__main__":
+	parser: argparse.ArgumentParser = argparse.ArgumentParser(
+		description="Write the commit log since the last version, oldest first",
+	)
+	_ = parser.add_argument("last_version", help="tag or commit to start from")
+	_ = parser.add_argument("commit_log_file", help="markdown file to write")
+	_ = parser.add_argument(
+		"--group",
+		action="store_true",
+		help="group commits by conventional commit type (feat, fix, perf, other)",
+	)
+	_ = parser.add_argument(
+		"--json",
+		action="store_true",
+		help="also write the commits to <commit_log_file>.json",
+	)
+	_ = parser.add_argument(
+		"--types",
+		type=Path,
+		help='json file mapping commit hashes to the conventional commit prefix to use, like "feat(api)!"',
+	)
+	args: argparse.Namespace = parser.parse_args()
 	main(
-		last_version=sys.argv[1].strip(),
-		commit_log_file=sys.argv[2].strip(),
+		last_version=args.last_version.strip(),
+		commit_log_file=args.commit_log_file.strip(),
+		group=args.group,
+		json_output=args.json,
+		types_file=args.types,
 	)
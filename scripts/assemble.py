@@ -2,22 +2,46 @@
 # https://github.com/mivanit/python-project-makefile-template
 # license: https://creativecommons.org/licenses/by-sa/4.0/
 
-"""Assemble the makefile and helper scripts by replacing version placeholders.
+"""Assemble the makefile and helper scripts by filling template placeholders.
 
-Reads version from pyproject.toml and replaces ##[[VERSION]]## placeholders in:
+Fills ##[[NAME]]## placeholders in these templates, processed in parallel:
 - makefile.template -> makefile
 - scripts/make/*.py -> scripts/out/*.py, .meta/scripts/*.py
+
+along with a MANIFEST.json of the sha256 of every assembled script, which
+`make self-setup-scripts` verifies downloads against.
+
+`VERSION` comes from `[project]` in pyproject.toml, other names from
+`[tool.makefile.assemble.variables]`, and `--set NAME=VALUE` overrides either.
+Unknown placeholders are reported, and the files containing them are not written.
+
+Outputs are only written when their content changes, so their mtimes stay put
+otherwise. With `--check`, nothing is written, and the exit code is 1 if any
+output is out of date.
 """
 
 from __future__ import annotations
 
+import argparse
+import functools
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
 try:
 	import tomllib  # type: ignore[import-not-found]
 except ImportError:
 	import tomli as tomllib  # type: ignore
 
+PYPROJECT_PATH: Path = Path("pyproject.toml")
+"path of the pyproject.toml which we read template variables from"
+
 MAKEFILE_TEMPLATE_PATH: Path = Path("makefile.template")
 "path of the makefile template which we read"
 
@@ -39,38 +63,250 @@ META_SCRIPTS_DIR: Path = Path(".meta") / "scripts"
 TEMPLATE_SYNTAX: str = "##[[{var}]]##"
 "template syntax in the makefile and script templates"
 
-with open("pyproject.toml", "rb") as f_pyproject:
-	VERSION: str = tomllib.load(f_pyproject)["project"]["version"]
+MANIFEST_NAME: str = "MANIFEST.json"
+"manifest with the sha256 of every assembled script, written next to them"
+
+
+PLACEHOLDER_PATTERN: re.Pattern[str] = re.compile(
+	r"##\[\[([A-Za-z_][A-Za-z0-9_]*)\]\]##"
+)
+"matches any `TEMPLATE_SYNTAX` placeholder, capturing its name"
+
+VARIABLES_TOOL_PATH: tuple[str, ...] = ("tool", "makefile", "assemble", "variables")
+"table in pyproject.toml with extra template variables"
+
+
+def read_variables(pyproject_path: Path = PYPROJECT_PATH) -> dict[str, str]:
+	"template variables from pyproject.toml: `VERSION` from `[project]`, plus everything in `[tool.makefile.assemble.variables]`"
+	with open(pyproject_path, "rb") as f_pyproject:
+		pyproject: dict[str, Any] = tomllib.load(f_pyproject)
+
+	table: Any = pyproject
+	for key in VARIABLES_TOOL_PATH:
+		table = table.get(key, {}) if isinstance(table, dict) else {}
+
+	return {
+		"VERSION": pyproject["project"]["version"],
+		**{str(k): str(v) for k, v in table.items()},
+	}
+
+
+def render(contents: str, variables: dict[str, str]) -> tuple[str, list[str]]:
+	"""fill every placeholder in *contents* in a single pass
+
+	returns the result and the names of any unknown placeholders, which are left as they are
+	"""
+	unknown: list[str] = []
+
+	def _fill(match: re.Match[str]) -> str:
+		name: str = match.group(1)
+		if name in variables:
+			return variables[name]
+		unknown.append(name)
+		return match.group(0)
+
+	return PLACEHOLDER_PATTERN.sub(_fill, contents), unknown
+
+
+@dataclass(frozen=True)
+class TemplateJob:
+	"a template, the paths its rendered contents go to, and the variables to render it with"
+
+	template: Path
+	outputs: tuple[Path, ...]
+	variables: dict[str, str]
+
+
+def assemble_make(variables: dict[str, str]) -> list[TemplateJob]:
+	"the makefile, where the version gets formatted into the header box"
+	version_str: str = f"#| version: v{variables['VERSION']}"
+	return [
+		TemplateJob(
+			template=MAKEFILE_TEMPLATE_PATH,
+			outputs=(MAKEFILE_PATH,),
+			variables={**variables, "VERSION": f"{version_str:<68}|"},
+		)
+	]
+
+
+def assemble_scripts(variables: dict[str, str]) -> list[TemplateJob]:
+	"template scripts from scripts/make/, each written to scripts/out/ and .meta/scripts/"
+	return [
+		TemplateJob(
+			template=script_path,
+			outputs=(
+				SCRIPTS_OUT_DIR / script_path.name,
+				META_SCRIPTS_DIR / script_path.name,
+			),
+			variables=variables,
+		)
+		for script_path in sorted(SCRIPTS_MAKE_DIR.glob("*.py"))
+	]
+
 
+def is_up_to_date(path: Path, contents: str) -> bool:
+	"whether *path* already has exactly *contents*"
+	try:
+		return path.read_bytes() == contents.encode("utf-8")
+	except FileNotFoundError:
+		return False
 
-def assemble_make() -> None:
-	"assemble the makefile (just version replacement)"
-	contents: str = MAKEFILE_TEMPLATE_PATH.read_text()
 
-	# version
-	version_str: str = f"#| version: v{VERSION}"
-	contents = contents.replace(
-		TEMPLATE_SYNTAX.format(var="VERSION"),
-		f"{version_str:<68}|",
+def write_atomic(path: Path, contents: str) -> None:
+	"write to a temp file next to *path*, then rename it into place, so readers never see a partial file"
+	path.parent.mkdir(parents=True, exist_ok=True)
+	tmp: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+	tmp.write_bytes(contents.encode("utf-8"))
+	tmp.replace(path)
+
+
+@dataclass
+class JobResult:
+	"what happened when processing a `TemplateJob`"
+
+	n_outputs: int
+	stale: list[Path]
+	unknown: list[str]
+	contents: str
+
+
+def write_outputs(
+	contents: str, outputs: tuple[Path, ...], check: bool = False
+) -> list[Path]:
+	"write *contents* to whichever of *outputs* differ from it, unless *check*. returns those outputs"
+	stale: list[Path] = [path for path in outputs if not is_up_to_date(path, contents)]
+	if not check:
+		for path in stale:
+			write_atomic(path, contents)
+	return stale
+
+
+def process(job: TemplateJob, check: bool = False) -> JobResult:
+	"""render *job* and write its stale outputs, unless *check*
+
+	nothing is written if the template has unknown placeholders
+	"""
+	contents: str
+	unknown: list[str]
+	contents, unknown = render(job.template.read_text(encoding="utf-8"), job.variables)
+	return JobResult(
+		n_outputs=len(job.outputs),
+		stale=write_outputs(contents, job.outputs, check=check or bool(unknown)),
+		unknown=unknown,
+		contents=contents,
 	)
 
-	MAKEFILE_PATH.write_text(contents)
 
+def script_manifest(version: str, scripts: dict[str, str]) -> str:
+	"""json manifest of the sha256 of each assembled script, by file name
 
-def assemble_scripts() -> None:
-	"read template scripts from scripts/make/, replace version, write to scripts/out/ and .meta/scripts/"
-	SCRIPTS_OUT_DIR.mkdir(exist_ok=True)
-	META_SCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-	for script_path in SCRIPTS_MAKE_DIR.glob("*.py"):
-		contents: str = script_path.read_text()
-		contents = contents.replace(
-			TEMPLATE_SYNTAX.format(var="VERSION"),
-			VERSION,
+	`make self-setup-scripts` greps this for `"<name>": "<sha256>"`, so keep one entry per line
+	"""
+	return (
+		json.dumps(
+			{
+				"version": version,
+				"sha256": {
+					name: hashlib.sha256(contents.encode("utf-8")).hexdigest()
+					for name, contents in sorted(scripts.items())
+				},
+			},
+			indent="\t",
 		)
-		(SCRIPTS_OUT_DIR / script_path.name).write_text(contents)
-		(META_SCRIPTS_DIR / script_path.name).write_text(contents)
+		+ "\n"
+	)
+
+
+def main(check: bool = False, overrides: dict[str, str] | None = None) -> int:
+	"""assemble everything in parallel, writing only changed outputs
+
+	*overrides* take precedence over variables from pyproject.toml. with
+	*check*, write nothing and return 1 if any output is stale. unknown
+	placeholders are reported, and are an error either way.
+	"""
+	variables: dict[str, str] = {**read_variables(), **(overrides or {})}
+	jobs: list[TemplateJob] = [
+		*assemble_make(variables),
+		*assemble_scripts(variables),
+	]
+	with ThreadPoolExecutor() as pool:
+		results: list[JobResult] = list(
+			pool.map(functools.partial(process, check=check), jobs)
+		)
+
+	if not any(result.unknown for result in results):
+		manifest: str = script_manifest(
+			variables["VERSION"],
+			{
+				job.template.name: result.contents
+				for job, result in zip(jobs, results)
+				if job.template.parent == SCRIPTS_MAKE_DIR
+			},
+		)
+		manifest_outputs: tuple[Path, ...] = (
+			SCRIPTS_OUT_DIR / MANIFEST_NAME,
+			META_SCRIPTS_DIR / MANIFEST_NAME,
+		)
+		results.append(
+			JobResult(
+				n_outputs=len(manifest_outputs),
+				stale=write_outputs(manifest, manifest_outputs, check=check),
+				unknown=[],
+				contents=manifest,
+			)
+		)
+
+	n_outputs: int = sum(result.n_outputs for result in results)
+	stale: list[Path] = [path for result in results for path in result.stale]
+	n_unknown: int = 0
+	for job, result in zip(jobs, results):
+		for name in sorted(set(result.unknown)):
+			print(
+				f"{job.template.as_posix()}: unknown placeholder {TEMPLATE_SYNTAX.format(var=name)}, pass `--set {name}=...`",
+				file=sys.stderr,
+			)
+			n_unknown += 1
+
+	if check:
+		for path in stale:
+			print(f"{path.as_posix()} is out of date", file=sys.stderr)
+		if stale:
+			print("run `python scripts/assemble.py` to update", file=sys.stderr)
+			return 1
+		if not n_unknown:
+			print(f"all {n_outputs} assembled files are up to date")
+		return 1 if n_unknown else 0
+
+	n_written: int = sum(len(result.stale) for result in results if not result.unknown)
+	print(f"wrote {n_written} of {n_outputs} assembled files")
+	return 1 if n_unknown else 0
+
+
+def parse_set(arg: str) -> tuple[str, str]:
+	"parse a `KEY=VAL` argument to `--set`"
+	key, sep, value = arg.partition("=")
+	if not sep or not PLACEHOLDER_PATTERN.fullmatch(TEMPLATE_SYNTAX.format(var=key)):
+		msg: str = f"expected KEY=VAL with KEY a valid placeholder name, got {arg!r}"
+		raise argparse.ArgumentTypeError(msg)
+	return key, value
 
 
 if __name__ == "__main__":
-	assemble_make()
-	assemble_scripts()
+	parser: argparse.ArgumentParser = argparse.ArgumentParser(
+		description="Assemble the makefile and helper scripts from their templates",
+	)
+	_ = parser.add_argument(
+		"--check",
+		action="store_true",
+		help="write nothing, and exit with 1 if any assembled file is out of date",
+	)
+	_ = parser.add_argument(
+		"--set",
+		type=parse_set,
+		action="append",
+		default=[],
+		metavar="KEY=VAL",
+		help="set a template variable, overriding pyproject.toml. may be repeated",
+	)
+	args: argparse.Namespace = parser.parse_args()
+	sys.exit(main(check=args.check, overrides=dict(args.set)))
@@ -5,16 +5,23 @@
 
 """Clean up docs directory based on pyproject.toml configuration.
 
-Removes generated documentation files while preserving resources and
-files specified in [tool.makefile.docs.no_clean].
+Removes generated documentation files, recursively, while preserving resources
+and files matching the glob patterns in [tool.makefile.docs.no_clean].
 
-Usage: python docs_clean.py <pyproject_path> <docs_dir> [extra_preserve...]
+Usage: python docs_clean.py <pyproject_path> <docs_dir> [extra_preserve...] [--dry-run]
 """
 
 from __future__ import annotations
 
+import argparse
+import ctypes
+import os
+import re
 import shutil
+import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from pathlib import Path
 from typing import Any, cast
@@ -42,10 +49,10 @@ def deep_get(
 	)
 
 
-def read_config(pyproject_path: Path) -> tuple[Path, set[Path]]:
-	"read configuration from pyproject.toml"
+def read_config(pyproject_path: Path) -> tuple[Path, list[str]]:
+	"read the docs dir and the `no_clean` patterns from pyproject.toml"
 	if not pyproject_path.is_file():
-		return Path(DEFAULT_DOCS_DIR), set()
+		return Path(DEFAULT_DOCS_DIR), []
 
 	with pyproject_path.open("rb") as f:
 		config: dict[str, Any] = cast("dict[str, Any]", tomllib.load(f))  # pyright: ignore[reportUnknownMemberType]
@@ -53,39 +60,286 @@ def read_config(pyproject_path: Path) -> tuple[Path, set[Path]]:
 	preserved: list[str] = deep_get(config, f"{TOOL_PATH}.no_clean", [])
 	docs_dir: Path = Path(deep_get(config, f"{TOOL_PATH}.output_dir", DEFAULT_DOCS_DIR))
 
-	# Convert to absolute paths and validate
-	preserve_set: set[Path] = set()
+	# validate: patterns are relative to, and must stay within, the docs dir
 	for p in preserved:
-		full_path = (docs_dir / p).resolve()
-		if not full_path.as_posix().startswith(docs_dir.resolve().as_posix()):
+		if p.startswith("/") or ".." in p.split("/"):
 			err_msg: str = f"Preserved path '{p}' must be within docs directory"
 			raise ValueError(err_msg)
-		preserve_set.add(docs_dir / p)
 
-	return docs_dir, preserve_set
+	return docs_dir, list(preserved)
 
 
-def clean_docs(docs_dir: Path, preserved: set[Path]) -> None:
-	"""delete files not in preserved set
+def _translate_glob(pattern: str) -> str:
+	"""translate a glob to a regex, where `*`, `?`, and `[...]` don't match `/` but `**` does
 
-	TODO: this is not recursive
+	unlike `fnmatch.translate`, whose `*` also matches `/`. a `**/` matches
+	zero or more whole directories, so `a/**/b` matches `a/b` too
 	"""
-	for path in docs_dir.iterdir():
-		if path.is_file() and path not in preserved:
-			path.unlink()
-		elif path.is_dir() and path not in preserved:
-			shutil.rmtree(path)
+	parts: list[str] = []
+	i: int = 0
+	while i < len(pattern):
+		c: str = pattern[i]
+		if pattern.startswith("**/", i):
+			parts.append("(?:.*/)?")
+			i += 3
+			continue
+		if pattern.startswith("**", i):
+			parts.append(".*")
+			i += 2
+			continue
+		if c == "*":
+			parts.append("[^/]*")
+		elif c == "?":
+			parts.append("[^/]")
+		elif c == "[" and "]" in pattern[i + 1 :]:
+			end: int = pattern.index("]", i + 1)
+			body: str = pattern[i + 1 : end]
+			parts.append(f"[^/{body[1:]}]" if body.startswith("!") else f"[{body}]")
+			i = end
+		else:
+			parts.append(re.escape(c))
+		i += 1
+	return "".join(parts)
+
+
+def compile_patterns(
+	patterns: list[str],
+	paths: list[str] | None = None,
+) -> re.Pattern[str]:
+	"""compile `no_clean` patterns into one regex, matched against posix paths relative to the docs dir
+
+	- a pattern without a `/` (like `"*.svg"` or `".nojekyll"`) matches a name at any depth
+	- any other pattern (like `"resources/**"` or `"coverage/index.html"`) is
+	anchored at the docs dir
+	- *paths* are not globs, but exact paths, always anchored at the docs dir
+	- a trailing `/` is ignored, and a matching directory preserves everything in it
+	"""
+	regexes: list[str] = []
+	for pattern in patterns:
+		pattern = pattern.strip("/")  # noqa: PLW2901
+		if not pattern:
+			continue
+		anchor: str = "" if "/" in pattern else "(?:.*/)?"
+		regexes.append(f"{anchor}{_translate_glob(pattern)}")
+	regexes.extend(
+		re.escape(path.strip("/")) for path in paths or [] if path.strip("/")
+	)
+	if not regexes:
+		# matches nothing
+		return re.compile(r"(?!)")
+	return re.compile(f"(?:{'|'.join(regexes)})(?:/.*)?", re.DOTALL)
+
+
+def find_removable(
+	docs_dir: Path,
+	preserved: re.Pattern[str],
+) -> tuple[list[str], list[str], list[str]]:
+	"""walk *docs_dir*, returning the preserved paths, and the files and directories to remove
+
+	preserved paths are relative to *docs_dir*, and a preserved directory is
+	kept whole. directories are only removed if nothing in them is preserved,
+	and come deepest first. uses the entry types cached by `os.scandir`, so
+	there is no `stat` per entry.
+	"""
+	kept: list[str] = []
+	files: list[str] = []
+	dirs: list[str] = []
+
+	def _walk(path: str, rel_prefix: str) -> bool:
+		"returns whether everything under *path* gets removed"
+		removable: bool = True
+		with os.scandir(path) as it:
+			for entry in it:
+				rel: str = rel_prefix + entry.name
+				if preserved.fullmatch(rel):
+					kept.append(rel)
+					removable = False
+				elif entry.is_dir(follow_symlinks=False):
+					if _walk(entry.path, rel + "/"):
+						dirs.append(entry.path)
+					else:
+						removable = False
+				else:
+					files.append(entry.path)
+		return removable
+
+	_walk(str(docs_dir), "")
+	return kept, files, dirs
+
+
+# generations of the docs dir. make_docs.py has a copy of these, to stage a
+# build and swap it in the same way
+# ============================================================
+
+STAGING_SUFFIX: str = ".staging"
+"the new generation of the docs dir is assembled in `.<docs dir name>.staging`, next to it"
+
+OLD_GENERATION_SUFFIX: str = ".old-"
+"replaced generations are renamed to `.<docs dir name>.old-<ns>`, then deleted in the background"
+
+_AT_FDCWD: int = -100
+_RENAME_EXCHANGE: int = 2
+
+
+def generation_path(docs_dir: Path, suffix: str) -> Path:
+	"a sibling of *docs_dir*, so renames between them stay on one filesystem"
+	return docs_dir.with_name(f".{docs_dir.name}{suffix}")
+
+
+def retire_generation(path: Path, docs_dir: Path) -> None:
+	"""rename *path* out of the way, then delete it in a detached background process
+
+	the rename is O(1), and the deletion outlives this process
+	"""
+	old: Path = generation_path(docs_dir, f"{OLD_GENERATION_SUFFIX}{time.time_ns()}")
+	path.rename(old)
+	_ = subprocess.Popen(  # noqa: S603
+		[
+			sys.executable,
+			"-c",
+			"import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)",
+			str(old),
+		],
+		stdin=subprocess.DEVNULL,
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+		start_new_session=True,
+	)
+
+
+def _renameat2_exchange(a: Path, b: Path) -> bool:
+	"swap *a* and *b* with `renameat2(RENAME_EXCHANGE)`, returns `False` where that is unavailable"
+	if sys.platform != "linux":
+		return False
+	try:
+		# glibc 2.28+, not musl
+		renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+	except (OSError, AttributeError):
+		return False
+	renameat2.argtypes = (
+		ctypes.c_int,
+		ctypes.c_char_p,
+		ctypes.c_int,
+		ctypes.c_char_p,
+		ctypes.c_uint,
+	)
+	# fails with EINVAL on filesystems which don't support it
+	return (
+		renameat2(
+			_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE
+		)
+		== 0
+	)
+
+
+def exchange_directories(a: Path, b: Path) -> None:
+	"""swap two directories
+
+	atomic only on linux with glibc, on a filesystem supporting
+	`renameat2(RENAME_EXCHANGE)`. everywhere else this falls back to three
+	renames, which is NOT atomic: between them *b* briefly does not exist, and
+	if interrupted, *b* can be left missing with its contents at `<a>.swap`
+	"""
+	if _renameat2_exchange(a, b):
+		return
+	tmp: Path = a.with_name(f"{a.name}.swap")
+	b.rename(tmp)
+	a.rename(b)
+	tmp.rename(a)
+
+
+def swap_in_preserved(docs_dir: Path, kept: list[str]) -> None:
+	"""replace *docs_dir* with a new generation holding only the *kept* paths
+
+	the kept paths are hard-linked into a staging dir, which is swapped in for
+	*docs_dir* with `exchange_directories`. the old generation is deleted in the background,
+	so this costs one link per kept file, no matter how much gets removed.
+	"""
+	staging: Path = generation_path(docs_dir, STAGING_SUFFIX)
+	if staging.exists():
+		# left behind by an interrupted build
+		retire_generation(staging, docs_dir)
+	staging.mkdir()
+	shutil.copystat(docs_dir, staging)
+	try:
+		for rel in kept:
+			src: Path = docs_dir / rel
+			dst: Path = staging / rel
+			dst.parent.mkdir(parents=True, exist_ok=True)
+			if src.is_dir() and not src.is_symlink():
+				shutil.copytree(src, dst, symlinks=True, copy_function=os.link)
+			elif src.is_symlink():
+				dst.symlink_to(src.readlink())
+			else:
+				os.link(src, dst)
+		exchange_directories(staging, docs_dir)
+	except (OSError, shutil.Error):
+		shutil.rmtree(staging, ignore_errors=True)
+		raise
+	retire_generation(staging, docs_dir)
+
+
+def clean_docs(
+	docs_dir: Path,
+	preserved: re.Pattern[str],
+	dry_run: bool = False,
+	batch_size: int = 1000,
+) -> int:
+	"""delete everything under *docs_dir* not matching *preserved*, see `compile_patterns`
+
+	swaps in a new generation of *docs_dir* holding only the preserved paths,
+	see `swap_in_preserved`. where that fails (no hard links, or *docs_dir* is
+	a mount point), files are deleted in place in parallel batches, then
+	emptied directories, deepest first. with *dry_run*, only prints what would
+	be removed. returns the number of files and directories removed.
+	"""
+	kept: list[str]
+	files: list[str]
+	dirs: list[str]
+	kept, files, dirs = find_removable(docs_dir, preserved)
+
+	if dry_run:
+		for path in files + dirs:
+			print(path)
+		return len(files) + len(dirs)
+	if not files and not dirs:
+		return 0
+
+	try:
+		swap_in_preserved(docs_dir, kept)
+	except (OSError, shutil.Error):
+		pass
+	else:
+		return len(files) + len(dirs)
+
+	# the paths are the strings from `os.scandir`, no need for a `Path` each
+	def _unlink_batch(batch: list[str]) -> None:
+		for path in batch:
+			os.unlink(path)  # noqa: PTH108
+
+	# unlinking is all syscalls, so threads are enough
+	with ThreadPoolExecutor() as pool:
+		list(
+			pool.map(
+				_unlink_batch,
+				[files[i : i + batch_size] for i in range(0, len(files), batch_size)],
+			)
+		)
+	for path in dirs:
+		os.rmdir(path)  # noqa: PTH106
+	return len(files) + len(dirs)
 
 
 def main(
 	pyproject_path: str,
 	docs_dir_cli: str,
 	extra_preserve: list[str],
+	dry_run: bool = False,
 ) -> None:
 	"Clean up docs directory based on pyproject.toml configuration."
 	docs_dir: Path
-	preserved: set[Path]
-	docs_dir, preserved = read_config(Path(pyproject_path))
+	patterns: list[str]
+	docs_dir, patterns = read_config(Path(pyproject_path))
 
 	if not docs_dir.is_dir():
 		msg = f"Docs directory '{docs_dir}' not found"
@@ -94,10 +348,37 @@ def main(
 		msg = f"Docs directory mismatch: {docs_dir = } != {docs_dir_cli = }. this is probably because you changed one of `pyproject.toml:{TOOL_PATH}.output_dir` (the former) or `makefile:DOCS_DIR` (the latter) without updating the other."
 		raise ValueError(msg)
 
-	for x in extra_preserve:
-		preserved.add(Path(x))
-	clean_docs(docs_dir, preserved)
+	# extra paths are given relative to the cwd, not the docs dir. those
+	# outside it have nothing to preserve
+	extra_paths: list[str] = [
+		Path(x).relative_to(docs_dir).as_posix()
+		for x in extra_preserve
+		if Path(x).is_relative_to(docs_dir)
+	]
+
+	n_removed: int = clean_docs(
+		docs_dir, compile_patterns(patterns, extra_paths), dry_run=dry_run
+	)
+	print(
+		f"{'would remove' if dry_run else 'removed'} {n_removed} files and directories from '{docs_dir}'"
+	)
 
 
 if __name__ == "__main__":
-	main(sys.argv[1], sys.argv[2], sys.argv[3:])
+	parser: argparse.ArgumentParser = argparse.ArgumentParser(
+		description="Clean up docs directory based on pyproject.toml configuration",
+	)
+	_ = parser.add_argument("pyproject_path", help="path to pyproject.toml")
+	_ = parser.add_argument("docs_dir", help="docs directory, must match the config")
+	_ = parser.add_argument(
+		"extra_preserve",
+		nargs="*",
+		help="extra paths (relative to the cwd) to preserve, like the resources dir",
+	)
+	_ = parser.add_argument(
+		"--dry-run",
+		action="store_true",
+		help="print what would be removed, without removing anything",
+	)
+	args: argparse.Namespace = parser.parse_args()
+	main(args.pyproject_path, args.docs_dir, args.extra_preserve, dry_run=args.dry_run)
@@ -8,20 +8,41 @@
 Reads configuration from [tool.makefile.docs] in pyproject.toml.
 Supports combined single-file markdown output and notebook conversion.
 
-Usage: python make_docs.py [--serve] [--warn-all] [--combined]
+Usage: python make_docs.py [--serve [--port N] [--watch]] [--warn-all] [--combined [--split]] [--full] [--jobs N]
 """
 
 from __future__ import annotations
 
 import argparse
+import base64
+import ctypes
+import email.utils
+import functools
+import hashlib
+import http
+import http.server
+import importlib.util
 import inspect  # noqa: TC003
+import io
+import itertools
 import json
+import os
 import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import types
+import urllib.parse
 import warnings
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from functools import reduce
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, BinaryIO, cast
 
 try:
 	# python 3.11+
@@ -35,6 +56,7 @@ import pdoc.doc  # type: ignore[import-not-found]
 import pdoc.extract  # type: ignore[import-not-found]
 import pdoc.render  # type: ignore[import-not-found]
 import pdoc.render_helpers  # type: ignore[import-not-found]
+import pdoc.search  # type: ignore[import-not-found]
 from markupsafe import Markup
 
 """
@@ -111,6 +133,21 @@ def deep_get(
 	return output
 
 
+def write_output(path: Path, data: str | bytes) -> None:
+	"""write *data* to a temp file next to *path*, then rename it into place
+
+	outputs are never written through in place, so readers never see a partial
+	file, and files hard-linked from a previous build (see `stage_output_entries`)
+	are left untouched
+	"""
+	tmp: Path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+	if isinstance(data, str):
+		tmp.write_text(data, encoding="utf-8")
+	else:
+		tmp.write_bytes(data)
+	tmp.replace(path)
+
+
 # CONFIGURATION -- read from CONFIG_PATH, assumed to be a pyproject.toml
 # ============================================================
 
@@ -129,19 +166,34 @@ class Config:
 	package_version: str = "unknown"
 	# under tool_path
 	output_dir_str: str = "docs"
+	# build manifests live here, outside the published output dir
+	cache_dir_str: str = ".meta/local/docs"
 	markdown_headings_increment: int = 2
+	# search index shards hold the modules sharing this many leading name parts
+	search_shard_depth: int = 2
 	warnings_ignore: list[str] = field(default_factory=list)
 	notebooks_enabled: bool = False
 	notebooks_descriptions: dict[str, str] = field(default_factory=dict)
 	notebooks_source_path_str: str = "notebooks"
 	notebooks_output_path_relative_str: str = "notebooks"
 	notebooks_index_template: str = _CONFIG_NOTEBOOKS_INDEX_TEMPLATE
+	# cell outputs larger than this many characters are handled per
+	# `notebooks_large_outputs`, 0 to disable
+	notebooks_max_output_size: int = 0
+	notebooks_large_outputs: str = "extract"
 
 	@property
 	def package_code_url(self) -> str:
 		"link to the code on the repo"
 		if "unknown" not in (self.package_name, self.package_version):
-			return self.package_repo_url + "/blob/v" + self.package_version + "/" + self.module_name + "/"
+			return (
+				self.package_repo_url
+				+ "/blob/v"
+				+ self.package_version
+				+ "/"
+				+ self.module_name
+				+ "/"
+			)
 		else:
 			return "unknown"
 
@@ -158,6 +210,11 @@ class Config:
 		"path to write the docs to, notebooks output dir is specified relative to this"
 		return Path(self.output_dir_str)
 
+	@property
+	def cache_dir(self) -> Path:
+		"path to keep build manifests in, so they are not published with the docs"
+		return Path(self.cache_dir_str)
+
 	@property
 	def notebooks_source_path(self) -> Path:
 		"path to read notebooks from"
@@ -176,13 +233,17 @@ _CFG_PATHS: dict[str, str] = dict(
 	package_repo_url="project.urls.Repository",
 	package_version="project.version",
 	output_dir_str=f"{TOOL_PATH}.output_dir",
+	cache_dir_str=f"{TOOL_PATH}.cache_dir",
 	markdown_headings_increment=f"{TOOL_PATH}.markdown_headings_increment",
+	search_shard_depth=f"{TOOL_PATH}.search_shard_depth",
 	warnings_ignore=f"{TOOL_PATH}.warnings_ignore",
 	notebooks_enabled=f"{TOOL_PATH}.notebooks.enabled",
 	notebooks_descriptions=f"{TOOL_PATH}.notebooks.descriptions",
 	notebooks_index_template=f"{TOOL_PATH}.notebooks.index_template",
 	notebooks_source_path_str=f"{TOOL_PATH}.notebooks.source_path",
 	notebooks_output_path_relative_str=f"{TOOL_PATH}.notebooks.output_path_relative",
+	notebooks_max_output_size=f"{TOOL_PATH}.notebooks.max_output_size",
+	notebooks_large_outputs=f"{TOOL_PATH}.notebooks.large_outputs",
 )
 
 
@@ -234,19 +295,21 @@ def set_global_config() -> Config:
 # ============================================================
 
 
-def replace_heading(match: re.Match[str]) -> str:
-	"replace a matched heading with an incremented version"
-	current_level: int = len(match.group(1))
-	new_level: int = min(
-		current_level + CONFIG.markdown_headings_increment,
-		6,
-	)  # Cap at h6
-	return "#" * new_level + match.group(2)
+_HEADING_PATTERN: re.Pattern[str] = re.compile(r"^#{1,6}(?=.)", re.MULTILINE)
+"the leading hashes of a markdown heading"
+
+
+@functools.cache
+def heading_replacements(increment: int) -> dict[str, str]:
+	"map from the hashes of each heading level to the incremented ones, capped at h6"
+	return {"#" * level: "#" * min(level + increment, 6) for level in range(1, 7)}
 
 
 def increment_markdown_headings(markdown_text: str) -> str:
 	"""Increment all Markdown headings in the given text by the specified amount
 
+	the amount is `CONFIG.markdown_headings_increment`, see `heading_replacements`
+
 	# Parameters:
 	- `markdown_text : str`
 		The input Markdown text
@@ -255,11 +318,10 @@ def increment_markdown_headings(markdown_text: str) -> str:
 	- `str`
 		The Markdown text with incremented heading levels.
 	"""
-	# Regular expression to match Markdown headings
-	heading_pattern: re.Pattern[str] = re.compile(r"^(#{1,6})(.+)$", re.MULTILINE)
-
-	# Replace all headings with incremented versions
-	return heading_pattern.sub(replace_heading, markdown_text)
+	replacements: dict[str, str] = heading_replacements(
+		CONFIG.markdown_headings_increment
+	)
+	return _HEADING_PATTERN.sub(lambda m: replacements[m[0]], markdown_text)
 
 
 def format_signature(sig: inspect.Signature, colon: bool) -> Markup:
@@ -268,17 +330,10 @@ def format_signature(sig: inspect.Signature, colon: bool) -> Markup:
 	result = pdoc.doc._PrettySignature._params(sig)  # type: ignore  # pyright: ignore[reportArgumentType,reportPrivateUsage]
 	return_annot = pdoc.doc._PrettySignature._return_annotation_str(sig)  # type: ignore  # pyright: ignore[reportArgumentType,reportPrivateUsage]
 
-	def _format_param(param: str) -> str:
-		"""Format a parameter for Markdown, including potential links."""
-		# This is a simplified version. You might need to adjust this
-		# to properly handle links in your specific use case.
-		return f"`{param}`"
-
-	# Format each parameter
-	pretty_result = [_format_param(param) for param in result]
-
-	# Join parameters
-	params_str = ", ".join(pretty_result)
+	# Format each parameter, and join them
+	# This is a simplified version. You might need to adjust this
+	# to properly handle links in your specific use case.
+	params_str: str = ", ".join(f"`{param}`" for param in result)
 
 	# Add return annotation
 	anno = ")"
@@ -318,17 +373,225 @@ def use_markdown_format() -> None:
 
 # notebook
 # ============================================================
-def convert_notebooks() -> None:
-	"""Convert Jupyter notebooks to HTML files"""
+NOTEBOOKS_MANIFEST_NAME: str = "notebooks-manifest.json"
+"manifest of converted notebooks, written to `Config.cache_dir`"
+
+
+@dataclass
+class NotebooksManifest:
+	"""Manifest of converted notebooks, see `convert_notebooks`"""
+
+	# hash of what affects every notebook: nbconvert version, this script, output limits
+	exporter_hash: str
+	# hash of the notebook list and descriptions the index was rendered from
+	index_hash: str = ""
+	# notebook file name to hash of its content
+	notebooks: dict[str, str] = field(default_factory=dict)
+
+	@classmethod
+	def read(cls, path: Path) -> NotebooksManifest | None:
+		"read the manifest, or `None` if missing or unreadable"
+		try:
+			return cls(**json.loads(path.read_text(encoding="utf-8")))
+		except (OSError, ValueError, TypeError):
+			return None
+
+	def write(self, path: Path) -> None:
+		"write the manifest as json"
+		write_output(path, json.dumps(asdict(self), indent=1))
+
+
+def _exporter_hash() -> str:
+	"hash of the exporter version and this script, any change means reconverting everything"
+	import nbconvert  # noqa: PLC0415
+	import nbformat  # noqa: PLC0415
+
+	return _hash_bytes(
+		nbconvert.__version__.encode(),
+		nbformat.__version__.encode(),
+		Path(__file__).read_bytes(),
+		f"{CONFIG.notebooks_max_output_size}:{CONFIG.notebooks_large_outputs}".encode(),
+	)
+
+
+_WORKER_HTML_EXPORTER: Any = None
+"per-process `nbconvert.HTMLExporter`, set by `_init_notebook_worker`"
+
+
+def _init_notebook_worker() -> None:
+	"create this process's exporter, once -- constructing one loads all the templates"
+	global _WORKER_HTML_EXPORTER  # noqa: PLW0603
+	import nbconvert  # noqa: PLC0415
+
+	_WORKER_HTML_EXPORTER = nbconvert.HTMLExporter()  # ty: ignore[possibly-missing-attribute] # pyright: ignore[reportConstantRedefinition]
+
+
+NOTEBOOKS_LARGE_OUTPUT_MODES: tuple[str, ...] = ("extract", "strip")
+"valid values of `tool.makefile.docs.notebooks.large_outputs`"
+
+_EXTRACT_MIME_TYPES: dict[str, str] = {
+	"image/png": ".png",
+	"image/jpeg": ".jpg",
+	"image/svg+xml": ".svg",
+}
+"image types which can be written to separate files, and their extensions"
+
+
+def _output_size(output: dict[str, Any]) -> int:
+	"size of a cell output, in characters of its (base64 or text) data"
+	if output.get("output_type") == "stream":
+		return len(output.get("text", ""))
+	return sum(
+		len(value) if isinstance(value, str) else len(json.dumps(value))
+		for value in output.get("data", {}).values()
+	)
+
+
+def limit_notebook_outputs(
+	nb: Any,  # noqa: ANN401
+	files_dir: Path,
+	max_size: int,
+	mode: str,
+) -> int:
+	"""Strip or extract cell outputs larger than *max_size*, one cell at a time
+
+	with `mode="extract"`, large png/jpeg/svg images are written to *files_dir*
+	and linked from the html instead of being inlined as base64. any other large
+	output, or every large output with `mode="strip"`, is replaced by a short
+	note. each image is dropped from the notebook as soon as it is written.
+
+	returns the number of outputs changed
+	"""
+	import nbformat  # noqa: PLC0415
+
+	n_changed: int = 0
+	for i_cell, cell in enumerate(nb.cells):
+		outputs: list[Any] = cell.get("outputs", [])
+		for i_output, output in enumerate(outputs):
+			size: int = _output_size(output)
+			if size <= max_size:
+				continue
+			n_changed += 1
+			data: dict[str, Any] = output.get("data", {})
+			mime: str | None = next((m for m in _EXTRACT_MIME_TYPES if m in data), None)
+			if mode == "extract" and mime is not None:
+				filename: str = (
+					f"cell{i_cell}_output{i_output}{_EXTRACT_MIME_TYPES[mime]}"
+				)
+				files_dir.mkdir(parents=True, exist_ok=True)
+				if mime == "image/svg+xml":
+					(files_dir / filename).write_text(data[mime], encoding="utf-8")
+					# the svg block of the templates checks this instead of metadata
+					output["svg_filename"] = f"{files_dir.name}/{filename}"
+				else:
+					(files_dir / filename).write_bytes(base64.b64decode(data[mime]))
+					output.setdefault("metadata", {}).setdefault("filenames", {})[
+						mime
+					] = f"{files_dir.name}/{filename}"
+				# keep the key so the template still picks the image block
+				output["data"] = {mime: ""}
+			else:
+				outputs[i_output] = nbformat.v4.new_output(  # pyright: ignore[reportUnknownMemberType]
+					"stream",
+					name="stdout",
+					text=f"[output of {size} characters removed from the docs]\n",
+				)
+	return n_changed
+
+
+def _convert_notebook(
+	notebook: Path,
+	output_notebook: Path,
+	max_output_size: int = 0,
+	large_outputs: str = "extract",
+) -> None:
+	"""convert one notebook to html with this process's exporter
+
+	extracted images go in `<notebook>_files/` next to the html, see `limit_notebook_outputs`.
+	the notebook is still read and rendered whole, nbconvert's templates need the
+	full notebook node. only the large outputs are dropped before rendering.
+	"""
+	import nbformat  # noqa: PLC0415
+
+	with open(notebook, "r") as f_in:
+		nb: nbformat.NotebookNode = cast(
+			"nbformat.NotebookNode",
+			nbformat.read(f_in, as_version=4),  # pyright: ignore[reportUnknownMemberType]
+		)
+	files_dir: Path = output_notebook.with_name(f"{output_notebook.stem}_files")
+	shutil.rmtree(files_dir, ignore_errors=True)
+	if max_output_size > 0:
+		limit_notebook_outputs(nb, files_dir, max_output_size, large_outputs)
+	body: str
+	body, _ = _WORKER_HTML_EXPORTER.from_notebook_node(nb)
+	write_output(output_notebook, body)
+
+
+def _convert_notebooks_in_pool(
+	notebooks: list[Path],
+	output_notebooks: list[Path],
+	jobs: int,
+) -> None:
+	"convert each of *notebooks* to the matching *output_notebooks*, in a process pool with `jobs > 1`"
+	jobs = min(jobs, len(notebooks))
+	if jobs > 1:
+		with ProcessPoolExecutor(
+			max_workers=jobs,
+			initializer=_init_notebook_worker,
+		) as pool:
+			# consume the results to raise any errors
+			list(
+				pool.map(
+					_convert_notebook,
+					notebooks,
+					output_notebooks,
+					itertools.repeat(CONFIG.notebooks_max_output_size),
+					itertools.repeat(CONFIG.notebooks_large_outputs),
+				)
+			)
+	elif notebooks:
+		_init_notebook_worker()
+		for notebook, output_notebook in zip(notebooks, output_notebooks):
+			_convert_notebook(
+				notebook,
+				output_notebook,
+				CONFIG.notebooks_max_output_size,
+				CONFIG.notebooks_large_outputs,
+			)
+
+
+def convert_notebooks(jobs: int = 1, output_directory: Path | None = None) -> None:
+	"""Convert Jupyter notebooks to HTML files
+
+	outputs go in `CONFIG.notebooks_output_path`, or the same relative path
+	under *output_directory* if given (a staging dir, see `stage_output_entries`).
+
+	with `jobs > 1`, notebooks are converted in a process pool, each worker
+	reusing a single exporter.
+
+	a `NOTEBOOKS_MANIFEST_NAME` manifest in `CONFIG.cache_dir` records the hash of
+	each converted notebook, so unchanged notebooks are skipped, outputs of
+	deleted notebooks are removed, and the index is only rendered again when
+	the notebooks or their descriptions change.
+	"""
 	try:
-		import nbconvert  # noqa: PLC0415
-		import nbformat  # noqa: PLC0415
+		import nbconvert  # noqa: PLC0415, F401
+		import nbformat  # noqa: PLC0415, F401
 	except ImportError as e:
 		err_msg: str = 'nbformat and nbconvert are required to convert notebooks to HTML, add "nbconvert>=7.16.4" to dev/docs deps'
 		raise ImportError(err_msg) from e
 
+	if CONFIG.notebooks_large_outputs not in NOTEBOOKS_LARGE_OUTPUT_MODES:
+		err_msg = f"{TOOL_PATH}.notebooks.large_outputs must be one of {NOTEBOOKS_LARGE_OUTPUT_MODES}, got {CONFIG.notebooks_large_outputs!r}"
+		raise ValueError(err_msg)
+
 	# create output directory
-	CONFIG.notebooks_output_path.mkdir(parents=True, exist_ok=True)
+	output_path: Path = (
+		CONFIG.notebooks_output_path
+		if output_directory is None
+		else output_directory / CONFIG.notebooks_output_path_relative_str
+	)
+	output_path.mkdir(parents=True, exist_ok=True)
 
 	# read in the notebook metadata
 	notebook_names: list[Path] = list(CONFIG.notebooks_source_path.glob("*.ipynb"))
@@ -341,29 +604,1134 @@ def convert_notebooks() -> None:
 		for notebook in notebook_names
 	]
 
-	# Render the index template
-	template: jinja2.Template = jinja2.Template(CONFIG.notebooks_index_template)
-	rendered_index: str = template.render(notebooks=notebooks)
+	manifest_path: Path = CONFIG.cache_dir / NOTEBOOKS_MANIFEST_NAME
+	old_manifest: NotebooksManifest | None = NotebooksManifest.read(manifest_path)
+	manifest: NotebooksManifest = NotebooksManifest(
+		exporter_hash=_exporter_hash(),
+		index_hash=_hash_bytes(
+			CONFIG.notebooks_index_template.encode(),
+			json.dumps(notebooks).encode(),
+		),
+		notebooks={
+			notebook.name: _hash_bytes(notebook.read_bytes())
+			for notebook in notebook_names
+		},
+	)
+	old_notebooks: dict[str, str] = (
+		old_manifest.notebooks
+		if old_manifest is not None
+		and old_manifest.exporter_hash == manifest.exporter_hash
+		else {}
+	)
 
-	# Write the rendered index to a file
-	index_path: Path = CONFIG.notebooks_output_path / "index.html"
-	index_path.write_text(rendered_index)
+	# Render the index template, if the notebooks or descriptions changed
+	index_path: Path = output_path / "index.html"
+	if (
+		old_manifest is None
+		or old_manifest.index_hash != manifest.index_hash
+		or not index_path.is_file()
+	):
+		template: jinja2.Template = jinja2.Template(CONFIG.notebooks_index_template)
+		rendered_index: str = template.render(notebooks=notebooks)
+		write_output(index_path, rendered_index)
+
+	# remove outputs of deleted notebooks
+	if old_manifest is not None:
+		for name in old_manifest.notebooks.keys() - manifest.notebooks.keys():
+			(output_path / Path(name).with_suffix(".html").name).unlink(missing_ok=True)
+			shutil.rmtree(
+				output_path / f"{Path(name).stem}_files",
+				ignore_errors=True,
+			)
 
-	# convert with nbconvert
+	# convert with nbconvert, skipping unchanged notebooks
+	stale: list[Path] = []
+	output_notebooks: list[Path] = []
 	for notebook in notebook_names:
-		output_notebook: Path = (
-			CONFIG.notebooks_output_path / notebook.with_suffix(".html").name
+		output_notebook: Path = output_path / notebook.with_suffix(".html").name
+		if (
+			old_notebooks.get(notebook.name) != manifest.notebooks[notebook.name]
+			or not output_notebook.is_file()
+		):
+			stale.append(notebook)
+			output_notebooks.append(output_notebook)
+	print(f"converting {len(stale)} of {len(notebook_names)} notebooks")
+
+	_convert_notebooks_in_pool(stale, output_notebooks, jobs)
+
+	manifest_path.parent.mkdir(parents=True, exist_ok=True)
+	manifest.write(manifest_path)
+	# older builds kept the manifest in the published output
+	(output_path / ".notebooks-manifest.json").unlink(missing_ok=True)
+
+
+"""
+########     ###    ########
+##     ##   ## ##   ##     ##
+##     ##  ##   ##  ##     ##
+########  ##     ## ########
+##        ######### ##   ##
+##        ##     ## ##    ##
+##        ##     ## ##     ##
+"""
+# parallel & incremental rendering
+# ============================================================
+
+DOCS_MANIFEST_NAME: str = "docs-manifest.json"
+"manifest of rendered modules, written to `Config.cache_dir`"
+
+_DOCS_MANIFEST_FORMAT: int = 1
+"bump to invalidate manifests written by older versions of this script"
+
+
+class LazyModules(Mapping[str, "pdoc.doc.Module"]):
+	"""`all_modules` mapping which only builds a `pdoc.doc.Module` when accessed
+
+	rendering one module only needs the *names* of all the others (for linking),
+	so each worker process builds just the modules it renders or links into.
+	`pdoc.doc.Module.from_name` is cached, so each is built at most once per process.
+	"""
+
+	def __init__(self, module_names: Iterable[str]) -> None:
+		"store the names, in order"
+		self.module_names: dict[str, None] = dict.fromkeys(module_names)
+		self.accessed: set[str] = set()
+		"names of modules accessed since last cleared, used to track dependencies"
+
+	def __getitem__(self, name: str) -> pdoc.doc.Module:
+		"build (or get the cached) module"
+		if name not in self.module_names:
+			raise KeyError(name)
+		self.accessed.add(name)
+		return pdoc.doc.Module.from_name(name)
+
+	def __contains__(self, name: object) -> bool:
+		"membership without building the module"
+		return name in self.module_names
+
+	def __iter__(self) -> Iterator[str]:
+		"iterate over module names"
+		return iter(self.module_names)
+
+	def __len__(self) -> int:
+		"number of modules"
+		return len(self.module_names)
+
+
+@dataclass
+class ModuleRecord:
+	"""What we know about a rendered module, stored in the docs manifest"""
+
+	source_hash: str
+	# hash of the public interface (docstrings, signatures), which is all that
+	# other modules' pages can depend on
+	docstring_hash: str
+	# output file, relative to the output dir
+	output: str
+	# other modules this page links to or inherits from
+	dependencies: list[str] = field(default_factory=list)
+	# this module's entries in the search index
+	search_documents: list[dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class DocsManifest:
+	"""Manifest of an html docs build, see `build_html_docs`"""
+
+	# hash of everything that affects every page: templates, config, module list
+	build_hash: str
+	modules: dict[str, ModuleRecord] = field(default_factory=dict)
+	# search index shard prefix to hash of its documents, see `write_search_shards`
+	search_shards: dict[str, str] = field(default_factory=dict)
+
+	@classmethod
+	def read(cls, path: Path) -> DocsManifest | None:
+		"read the manifest, or `None` if missing or unreadable"
+		try:
+			data: dict[str, Any] = json.loads(path.read_text(encoding="utf-8"))
+			return cls(
+				build_hash=data["build_hash"],
+				modules={
+					name: ModuleRecord(**record)
+					for name, record in data["modules"].items()
+				},
+				search_shards=data["search_shards"],
+			)
+		except (OSError, ValueError, KeyError, TypeError):
+			return None
+
+	def write(self, path: Path) -> None:
+		"write the manifest as json"
+		write_output(path, json.dumps(asdict(self)))
+
+
+def _hash_bytes(*chunks: bytes) -> str:
+	"sha256 hex digest of some chunks, separated so that boundaries matter"
+	h = hashlib.sha256()
+	for chunk in chunks:
+		h.update(chunk)
+		h.update(b"\0")
+	return h.hexdigest()
+
+
+def _source_hash(module_name: str) -> str:
+	"hash of a module's source file, without building the `pdoc.doc.Module`"
+	spec = importlib.util.find_spec(module_name)
+	origin: str | None = spec.origin if spec is not None else None
+	if origin is None or not Path(origin).is_file():
+		# namespace package or similar, nothing to hash
+		return _hash_bytes(module_name.encode())
+	return _hash_bytes(Path(origin).read_bytes())
+
+
+def _walk_members(namespace: pdoc.doc.Namespace[Any]) -> Iterator[pdoc.doc.Doc[Any]]:
+	"own members of a module or class, recursing into classes"
+	for member in namespace.own_members:
+		yield member
+		if isinstance(member, pdoc.doc.Class):
+			yield from _walk_members(member)
+
+
+def _docstring_hash(module: pdoc.doc.Module) -> str:
+	"hash of the docstrings and signatures of everything in a module"
+	chunks: list[bytes] = [module.docstring.encode()]
+	for member in _walk_members(module):
+		chunks.append(f"{member.fullname}:{member.kind}:{member.docstring}".encode())
+		if isinstance(member, pdoc.doc.Function):
+			chunks.append(str(member.signature).encode())
+		elif isinstance(member, pdoc.doc.Variable):
+			chunks.append(
+				f"{member.annotation_str}={member.default_value_str}".encode()
+			)
+	return _hash_bytes(*chunks)
+
+
+def _build_hash(module_names: list[str], template_directory: Path) -> str:
+	"hash of everything that affects all pages (including this script), any change means a full rebuild"
+	chunks: list[bytes] = [
+		str(_DOCS_MANIFEST_FORMAT).encode(),
+		pdoc.__version__.encode(),
+		Path(__file__).read_bytes(),
+		sys.version.encode(),
+		json.dumps(asdict(CONFIG), sort_keys=True).encode(),
+		"\n".join(module_names).encode(),
+	]
+	if template_directory.is_dir():
+		for template in sorted(template_directory.rglob("*")):
+			if template.is_file():
+				chunks.append(
+					template.relative_to(template_directory).as_posix().encode()
+				)
+				chunks.append(template.read_bytes())
+	return _hash_bytes(*chunks)
+
+
+def _module_dependencies(module: pdoc.doc.Module) -> set[str]:
+	"modules which members of *module* are taken from, or whose classes they inherit"
+	deps: set[str] = set()
+	for member in _walk_members(module):
+		deps.add(member.taken_from[0])
+		if isinstance(member, pdoc.doc.Class):
+			deps.update(base[0] for base in member.bases)
+	return deps
+
+
+_WORKER_ALL_MODULES: LazyModules
+"per-process `all_modules`, set by `_init_docs_worker`"
+
+_WORKER_IS_PUBLIC: Any = None
+"per-process `is_public` template macro, for building search documents"
+
+
+def _set_worker_modules(module_names: list[str]) -> None:
+	"set the `all_modules` used by `_render_html_module` in this process"
+	global _WORKER_ALL_MODULES, _WORKER_IS_PUBLIC  # noqa: PLW0603
+	_WORKER_ALL_MODULES = LazyModules(module_names)  # pyright: ignore[reportConstantRedefinition]
+	_WORKER_IS_PUBLIC = None  # pyright: ignore[reportConstantRedefinition]
+
+
+def _init_docs_worker(
+	module_names: list[str],
+	sys_path: list[str],
+	combined: bool,
+	warn_all: bool,
+) -> None:
+	"""set up a worker process the same way `__main__` sets up the parent
+
+	workers might be spawned rather than forked, so nothing is inherited: we
+	re-read the config, reapply warning filters and pdoc settings, and restore
+	the `sys.path` amendments `pdoc.extract.walk_specs` made in the parent.
+	"""
+	sys.path[:] = sys_path
+	set_global_config()
+	if not warn_all:
+		ignore_warnings()
+	configure_pdoc(combined)
+	if combined:
+		use_markdown_format()
+	_set_worker_modules(module_names)
+
+
+@pdoc.render_helpers.defuse_unsafe_reprs()
+def _search_documents(module: pdoc.doc.Module) -> list[dict[str, Any]]:
+	"""search index entries for one module, same as `pdoc.render.search_index` makes
+
+	uses the same "rather terrible hack" as pdoc to get at the `is_public` macro
+	"""
+	global _WORKER_IS_PUBLIC  # noqa: PLW0603
+	if not pdoc.render.env.globals["search"]:
+		return []
+	if _WORKER_IS_PUBLIC is None:
+		module_template: jinja2.Template = pdoc.render.env.get_template(
+			"module.html.jinja2"
+		)
+		ctx: Any = module_template.new_context(
+			{
+				"module": pdoc.doc.Module(types.ModuleType("")),
+				"all_modules": _WORKER_ALL_MODULES,
+			}
+		)
+		for _ in module_template.root_render_func(ctx):  # pyright: ignore[reportUnknownMemberType]
+			pass
+		_WORKER_IS_PUBLIC = ctx["is_public"]  # pyright: ignore[reportConstantRedefinition]
+	is_public: Any = _WORKER_IS_PUBLIC
+	return pdoc.search.make_index(
+		{module.modulename: module},
+		lambda x: bool(is_public(x).strip()),
+		cast("str", pdoc.render.env.globals["docformat"]),
+	)
+
+
+def _render_html_module(
+	module_name: str,
+	output_directory: Path,
+	source_hash: str,
+) -> tuple[str, ModuleRecord]:
+	"render one module to html, returns its manifest record"
+	_WORKER_ALL_MODULES.accessed.clear()
+	module: pdoc.doc.Module = _WORKER_ALL_MODULES[module_name]
+	out: str = pdoc.render.html_module(module, _WORKER_ALL_MODULES)
+	output: str = f"{module.fullname.replace('.', '/')}.html"
+	outfile: Path = output_directory / output
+	outfile.parent.mkdir(parents=True, exist_ok=True)
+	write_output(outfile, out.encode())
+
+	dependencies: set[str] = _WORKER_ALL_MODULES.accessed | _module_dependencies(module)
+	return module_name, ModuleRecord(
+		source_hash=source_hash,
+		docstring_hash=_docstring_hash(module),
+		output=output,
+		dependencies=sorted(
+			dep
+			for dep in dependencies
+			if dep != module_name and dep in _WORKER_ALL_MODULES
+		),
+		search_documents=_search_documents(module),
+	)
+
+
+def _transitive_dependents(
+	changed: set[str],
+	records: dict[str, ModuleRecord],
+) -> set[str]:
+	"modules in *records* depending on any in *changed*, directly or through each other"
+	dependents: set[str] = set()
+	frontier: set[str] = changed
+	while frontier:
+		frontier = {
+			name
+			for name, record in records.items()
+			if name not in dependents and frontier.intersection(record.dependencies)
+		}
+		dependents |= frontier
+	return dependents
+
+
+def build_html_docs(
+	*modules: str,
+	output_directory: Path,
+	manifest_path: Path,
+	jobs: int = 1,
+	full: bool = False,
+	warn_all: bool = False,
+) -> None:
+	"""Render html docs like `pdoc.pdoc`, but incrementally and optionally in parallel.
+
+	A manifest at *manifest_path* (kept outside *output_directory*, so it is not
+	published) records, for each module, the hash of its source and of its
+	docstrings, its output path, the modules it depends on, and its search index
+	entries. On later runs only modules whose source changed (or whose output is
+	missing) are re-rendered, followed by the modules depending, directly or
+	transitively, on any whose docstrings changed. Changes to the templates,
+	config, pdoc version, or the set of modules trigger a full rebuild, as does *full*.
+
+	With `jobs > 1`, modules are rendered in a process pool. The search index is
+	assembled from the per-module entries in the manifest, so unchanged modules
+	are never built, and only shards containing changed modules are compiled
+	again, see `write_search_shards`.
+	"""
+	module_names: list[str] = pdoc.extract.walk_specs(modules)
+	old_manifest: DocsManifest | None = (
+		None if full else DocsManifest.read(manifest_path)
+	)
+	manifest: DocsManifest = DocsManifest(
+		build_hash=_build_hash(
+			module_names,
+			CONFIG.output_dir / "resources/templates/html/",
+		)
+	)
+	source_hashes: dict[str, str] = {name: _source_hash(name) for name in module_names}
+
+	rebuild_all: bool = (
+		old_manifest is None or old_manifest.build_hash != manifest.build_hash
+	)
+	old_records: dict[str, ModuleRecord] = (
+		{} if rebuild_all or old_manifest is None else old_manifest.modules
+	)
+	stale: list[str] = [
+		name
+		for name in module_names
+		if name not in old_records
+		or old_records[name].source_hash != source_hashes[name]
+		or not (output_directory / old_records[name].output).is_file()
+	]
+
+	pool: ProcessPoolExecutor | None = None
+	if jobs > 1 and stale:
+		pool = ProcessPoolExecutor(
+			max_workers=jobs,
+			initializer=_init_docs_worker,
+			initargs=(module_names, sys.path.copy(), False, warn_all),
+		)
+	else:
+		_set_worker_modules(module_names)
+
+	def _render(names: list[str]) -> dict[str, ModuleRecord]:
+		args = (
+			names,
+			[output_directory] * len(names),
+			[source_hashes[n] for n in names],
+		)
+		results: Iterable[tuple[str, ModuleRecord]] = (
+			pool.map(_render_html_module, *args)
+			if pool is not None
+			else map(_render_html_module, *args)
+		)
+		return dict(results)
+
+	try:
+		rendered: dict[str, ModuleRecord] = _render(stale)
+
+		# pages of unchanged modules which depend, directly or through other
+		# modules, on a changed interface
+		changed_interfaces: set[str] = {
+			name
+			for name, record in rendered.items()
+			if name not in old_records
+			or old_records[name].docstring_hash != record.docstring_hash
+		}
+		dependents: set[str] = _transitive_dependents(
+			changed_interfaces,
+			{name: old_records[name] for name in module_names if name not in rendered},
+		)
+		rendered.update(_render([name for name in module_names if name in dependents]))
+	finally:
+		if pool is not None:
+			pool.shutdown()
+
+	manifest.modules = {
+		name: rendered[name] if name in rendered else old_records[name]
+		for name in module_names
+	}
+
+	if rebuild_all and old_manifest is not None:
+		# remove pages of modules which no longer exist
+		for name, record in old_manifest.modules.items():
+			if name not in manifest.modules:
+				(output_directory / record.output).unlink(missing_ok=True)
+	if rebuild_all or not (output_directory / "index.html").is_file():
+		index: str = pdoc.render.html_index(LazyModules(module_names))
+		if index:
+			write_output(output_directory / "index.html", index.encode())
+
+	manifest.search_shards = write_search_shards(
+		{name: record.search_documents for name, record in manifest.modules.items()},
+		output_directory=output_directory,
+		old_shards={}
+		if rebuild_all or old_manifest is None
+		else old_manifest.search_shards,
+		jobs=jobs,
+	)
+
+	manifest_path.parent.mkdir(parents=True, exist_ok=True)
+	manifest.write(manifest_path)
+	print(
+		f"rendered {len(rendered)} of {len(module_names)} modules"
+		+ (" (full rebuild)" if rebuild_all else "")
+	)
+
+
+SEARCH_DIR_NAME: str = "search"
+"directory in the output dir holding the search index shards and their manifest"
+
+SEARCH_JS_NAME: str = "search.js"
+"pdoc's single search index, written instead of the shards for pdoc's own search template"
+
+
+def sharded_search_template() -> bool:
+	"""whether the `search.html.jinja2` in use loads the shards, like the one in the resources dir
+
+	pdoc's default one loads a single `search.js` instead
+	"""
+	source: str = cast("jinja2.BaseLoader", pdoc.render.env.loader).get_source(
+		pdoc.render.env, "search.html.jinja2"
+	)[0]
+	return "pdocSearchManifest" in source
+
+
+def _search_shard_prefix(module_name: str) -> str:
+	"which shard a module's search documents go in: the first few parts of its name"
+	return ".".join(module_name.split(".")[: CONFIG.search_shard_depth])
+
+
+def _compile_search_shard(
+	prefix: str,
+	documents: list[dict[str, Any]],
+	compile_js: Path,
+) -> str:
+	"""js for one shard, registering its (precompiled if possible) index under *prefix*
+
+	like pdoc's `search.js` this is js rather than json, so it works with `file://`
+	"""
+	index: str = pdoc.search.precompile_index(documents, compile_js)
+	return (
+		"window.pdocSearchShards = window.pdocSearchShards || {};\n"
+		f"window.pdocSearchShards[{json.dumps(prefix)}] = {index};\n"
+	)
+
+
+@pdoc.render_helpers.defuse_unsafe_reprs()
+def write_search_shards(
+	documents: dict[str, list[dict[str, Any]]],
+	output_directory: Path,
+	old_shards: dict[str, str],
+	jobs: int = 1,
+) -> dict[str, str]:
+	"""Write the search index, split into shards by module prefix.
+
+	if the search template doesn't load shards (see `sharded_search_template`),
+	writes pdoc's single `search.js` instead, see `write_search_js`. otherwise
+	writes to `SEARCH_DIR_NAME/`:
+	- one `<prefix>.js` per shard, with the elasticlunr index of all modules
+	whose name starts with that prefix (see `_search_shard_prefix`),
+	precompiled at build time when `node` is available
+	- `manifest.js`, listing the shards with a hash of their contents
+	- `elasticlunr.min.js`, loaded once for all shards
+
+	the search template loads the manifest when the search box is focused,
+	then each shard, showing results as they arrive. shards whose hash is in
+	*old_shards* and whose file exists are not compiled again, and stale shard
+	files are removed.
+
+	returns the new prefix to hash mapping, for the manifest
+	"""
+	search_dir: Path = output_directory / SEARCH_DIR_NAME
+	search_js: Path = output_directory / SEARCH_JS_NAME
+	if not pdoc.render.env.globals["search"]:
+		shutil.rmtree(search_dir, ignore_errors=True)
+		search_js.unlink(missing_ok=True)
+		return {}
+	if not sharded_search_template():
+		shutil.rmtree(search_dir, ignore_errors=True)
+		return write_search_js(documents, search_js, old_shards)
+	search_js.unlink(missing_ok=True)
+	search_dir.mkdir(parents=True, exist_ok=True)
+
+	shards: dict[str, list[dict[str, Any]]] = {}
+	for module_name, module_documents in documents.items():
+		shards.setdefault(_search_shard_prefix(module_name), []).extend(
+			module_documents
 		)
-		with open(notebook, "r") as f_in:
-			nb: nbformat.NotebookNode = cast(
-				"nbformat.NotebookNode",
-				nbformat.read(f_in, as_version=4),  # pyright: ignore[reportUnknownMemberType]
+	shard_hashes: dict[str, str] = {
+		prefix: _hash_bytes(json.dumps(shard_documents).encode())
+		for prefix, shard_documents in shards.items()
+	}
+	stale: list[str] = [
+		prefix
+		for prefix, shard_hash in shard_hashes.items()
+		if old_shards.get(prefix) != shard_hash
+		or not (search_dir / f"{prefix}.js").is_file()
+	]
+
+	# node does the work, so threads are enough
+	compile_js: Path = Path(
+		cast("str", pdoc.render.env.get_template("build-search-index.js").filename)
+	)
+	with ThreadPoolExecutor(max_workers=max(jobs, 1)) as pool:
+		for prefix, content in zip(
+			stale,
+			pool.map(
+				lambda prefix: _compile_search_shard(
+					prefix, shards[prefix], compile_js
+				),
+				stale,
+			),
+		):
+			write_output(search_dir / f"{prefix}.js", content)
+
+	for shard_file in search_dir.glob("*.js"):
+		if shard_file.stem not in shard_hashes and shard_file.name not in (
+			"manifest.js",
+			"elasticlunr.min.js",
+		):
+			shard_file.unlink()
+
+	search_manifest: dict[str, Any] = {
+		"shards": [
+			{
+				"prefix": prefix,
+				"file": f"{prefix}.js",
+				"hash": shard_hashes[prefix][:16],
+			}
+			for prefix in shards
+		],
+	}
+	write_output(
+		search_dir / "manifest.js",
+		f"window.pdocSearchManifest = {json.dumps(search_manifest)};\n",
+	)
+	elasticlunr: str = cast("jinja2.BaseLoader", pdoc.render.env.loader).get_source(
+		pdoc.render.env, "resources/elasticlunr.min.js"
+	)[0]
+	elasticlunr_path: Path = search_dir / "elasticlunr.min.js"
+	if (
+		not elasticlunr_path.is_file()
+		or elasticlunr_path.read_text(encoding="utf-8") != elasticlunr
+	):
+		write_output(elasticlunr_path, elasticlunr)
+
+	print(f"compiled {len(stale)} of {len(shards)} search index shards")
+	return shard_hashes
+
+
+def write_search_js(
+	documents: dict[str, list[dict[str, Any]]],
+	search_js: Path,
+	old_shards: dict[str, str],
+) -> dict[str, str]:
+	"""Write pdoc's single `search.js`, with the index of every module
+
+	same as `pdoc.render.search_index` writes. not compiled again if the hash
+	of the documents is in *old_shards* under `SEARCH_JS_NAME`, and the file exists.
+
+	returns `SEARCH_JS_NAME` to the hash, for the manifest
+	"""
+	all_documents: list[dict[str, Any]] = [
+		document
+		for module_documents in documents.values()
+		for document in module_documents
+	]
+	index_hash: str = _hash_bytes(json.dumps(all_documents).encode())
+	if old_shards.get(SEARCH_JS_NAME) == index_hash and search_js.is_file():
+		print("search index unchanged")
+	else:
+		compile_js: Path = Path(
+			cast("str", pdoc.render.env.get_template("build-search-index.js").filename)
+		)
+		write_output(
+			search_js,
+			pdoc.render.env.get_template("search.js.jinja2").render(
+				search_index=pdoc.search.precompile_index(all_documents, compile_js)
+			),
+		)
+		print(f"compiled the search index into '{SEARCH_JS_NAME}'")
+	return {SEARCH_JS_NAME: index_hash}
+
+
+def _resolve_jobs(jobs: int) -> int:
+	"`0` means one job per cpu"
+	return jobs if jobs > 0 else (os.cpu_count() or 1)
+
+
+"""
+ ######  ##      ##    ###    ########
+##    ## ##  ##  ##   ## ##   ##     ##
+##       ##  ##  ##  ##   ##  ##     ##
+ ######  ##  ##  ## ##     ## ########
+      ## ##  ##  ## ######### ##
+##    ## ##  ##  ## ##     ## ##
+ ######   ###  ###  ##     ## ##
+"""
+# staged builds
+# ============================================================
+
+# generations of the output dir, same as in docs_clean.py, which swaps in a
+# new docs dir the same way. copied so this script doesn't need that one
+
+STAGING_SUFFIX: str = ".staging"
+"the new generation of the output dir is assembled in `.<output dir name>.staging`, next to it"
+
+OLD_GENERATION_SUFFIX: str = ".old-"
+"replaced generations are renamed to `.<output dir name>.old-<ns>`, then deleted in the background"
+
+_AT_FDCWD: int = -100
+_RENAME_EXCHANGE: int = 2
+
+
+def generation_path(output_directory: Path, suffix: str) -> Path:
+	"a sibling of *output_directory*, so renames between them stay on one filesystem"
+	return output_directory.with_name(f".{output_directory.name}{suffix}")
+
+
+def retire_generation(path: Path, output_directory: Path) -> None:
+	"""rename *path* out of the way, then delete it in a detached background process
+
+	the rename is O(1), and the deletion outlives this process
+	"""
+	old: Path = generation_path(
+		output_directory, f"{OLD_GENERATION_SUFFIX}{time.time_ns()}"
+	)
+	path.rename(old)
+	_ = subprocess.Popen(  # noqa: S603
+		[
+			sys.executable,
+			"-c",
+			"import shutil, sys; shutil.rmtree(sys.argv[1], ignore_errors=True)",
+			str(old),
+		],
+		stdin=subprocess.DEVNULL,
+		stdout=subprocess.DEVNULL,
+		stderr=subprocess.DEVNULL,
+		start_new_session=True,
+	)
+
+
+def _renameat2_exchange(a: Path, b: Path) -> bool:
+	"swap *a* and *b* with `renameat2(RENAME_EXCHANGE)`, returns `False` where that is unavailable"
+	if sys.platform != "linux":
+		return False
+	try:
+		# glibc 2.28+, not musl
+		renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+	except (OSError, AttributeError):
+		return False
+	renameat2.argtypes = (
+		ctypes.c_int,
+		ctypes.c_char_p,
+		ctypes.c_int,
+		ctypes.c_char_p,
+		ctypes.c_uint,
+	)
+	# fails with EINVAL on filesystems which don't support it
+	return (
+		renameat2(
+			_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE
+		)
+		== 0
+	)
+
+
+def exchange_directories(a: Path, b: Path) -> None:
+	"""swap two directories
+
+	atomic only on linux with glibc, on a filesystem supporting
+	`renameat2(RENAME_EXCHANGE)`. everywhere else this falls back to three
+	renames, which is NOT atomic: between them *b* briefly does not exist, and
+	if interrupted, *b* can be left missing with its contents at `<a>.swap`
+	"""
+	if _renameat2_exchange(a, b):
+		return
+	tmp: Path = a.with_name(f"{a.name}.swap")
+	b.rename(tmp)
+	a.rename(b)
+	tmp.rename(a)
+
+
+LEGACY_OUTPUTS: tuple[str, ...] = (".docs-manifest.json",)
+"written to the output dir by older versions of this script, removed by `swap_output_entries`"
+
+
+def html_output_entries() -> list[str]:
+	"""paths, relative to the output dir, which the html build writes
+
+	only these are staged and swapped in, so everything else in the output dir
+	(the resources dir, coverage reports, files written there during the
+	build) is left alone. includes `LEGACY_OUTPUTS`, which are never staged,
+	so that swapping removes them
+	"""
+	entries: list[str] = [
+		"index.html",
+		f"{CONFIG.module_name}.html",
+		CONFIG.module_name,
+		SEARCH_DIR_NAME,
+		SEARCH_JS_NAME,
+		*LEGACY_OUTPUTS,
+	]
+	if CONFIG.notebooks_enabled:
+		entries.append(Path(CONFIG.notebooks_output_path_relative_str).as_posix())
+	# an entry inside another one is staged and swapped along with it
+	return [
+		entry
+		for entry in entries
+		if not any(entry.startswith(f"{other}/") for other in entries)
+	]
+
+
+def _entry_kind(path: Path) -> str | None:
+	"`dir` for a directory, `file` for anything else (including symlinks), `None` if missing"
+	if path.is_symlink():
+		return "file"
+	if path.is_dir():
+		return "dir"
+	return "file" if path.exists() else None
+
+
+def _link(src: Path, dst: Path) -> None:
+	"copy the file or directory *src* to *dst* with hard links, or by copying where hard links are not supported"
+	if _entry_kind(src) == "dir":
+		try:
+			shutil.copytree(src, dst, symlinks=True, copy_function=os.link)
+		except (OSError, shutil.Error):
+			shutil.rmtree(dst, ignore_errors=True)
+			shutil.copytree(src, dst, symlinks=True)
+		return
+	try:
+		os.link(src, dst, follow_symlinks=False)
+	except (OSError, NotImplementedError):
+		shutil.copy2(src, dst, follow_symlinks=False)
+
+
+def stage_output_entries(output_directory: Path, entries: list[str]) -> Path:
+	"""create a staging dir holding copies of *entries* of *output_directory*, to build into
+
+	files are hard-linked rather than copied, so unchanged outputs cost one link
+	each. all outputs are written with `write_output`, which replaces files
+	instead of writing through the links, so the live output dir is untouched
+	until `swap_output_entries`. `LEGACY_OUTPUTS` are not copied.
+	"""
+	staging: Path = generation_path(output_directory, STAGING_SUFFIX)
+	if staging.exists():
+		# left behind by an interrupted build
+		retire_generation(staging, output_directory)
+	staging.mkdir(parents=True)
+	for entry in entries:
+		src: Path = output_directory / entry
+		if entry in LEGACY_OUTPUTS or _entry_kind(src) is None:
+			continue
+		dst: Path = staging / entry
+		dst.parent.mkdir(parents=True, exist_ok=True)
+		_link(src, dst)
+	return staging
+
+
+def swap_output_entries(
+	staging: Path, output_directory: Path, entries: list[str]
+) -> None:
+	"""replace *entries* of *output_directory* with the ones built in *staging*
+
+	each file is replaced with a rename, which is atomic, and each directory
+	with `exchange_directories`, which is atomic on linux with glibc but
+	elsewhere leaves the directory briefly missing. the entries are replaced
+	one after another though, so a reader can briefly see a mix of both builds,
+	like new pages with the old search index.
+
+	entries missing from *staging* are removed. replaced entries end up in
+	*staging*, which is then deleted in the background, see `retire_generation`.
+	"""
+	output_directory.mkdir(parents=True, exist_ok=True)
+	for entry in entries:
+		new: Path = staging / entry
+		live: Path = output_directory / entry
+		new_kind: str | None = _entry_kind(new)
+		live_kind: str | None = _entry_kind(live)
+		if new_kind == live_kind == "dir":
+			exchange_directories(new, live)
+			continue
+		if live_kind is not None and live_kind != new_kind:
+			# removed, or changed between file and directory
+			aside: Path = new.with_name(f"{new.name}.replaced")
+			aside.parent.mkdir(parents=True, exist_ok=True)
+			live.rename(aside)
+		if new_kind is not None:
+			live.parent.mkdir(parents=True, exist_ok=True)
+			new.replace(live)
+	retire_generation(staging, output_directory)
+	print(f"swapped new build into '{output_directory}'")
+
+
+def build_staged_html_docs(jobs: int, full: bool, warn_all: bool) -> None:
+	"""build the html docs (and notebooks, if enabled) in a staging dir, then swap them in
+
+	so readers (like `--serve`, or an rsync) never see a half built page, see
+	`swap_output_entries`. if the swap fails, the manifests are removed, since
+	some outputs may still be from the previous build
+	"""
+	entries: list[str] = html_output_entries()
+	staging: Path = stage_output_entries(CONFIG.output_dir, entries)
+	build_html_docs(
+		CONFIG.module_name,
+		output_directory=staging,
+		manifest_path=CONFIG.cache_dir / DOCS_MANIFEST_NAME,
+		jobs=jobs,
+		full=full,
+		warn_all=warn_all,
+	)
+	if CONFIG.notebooks_enabled:
+		convert_notebooks(jobs=jobs, output_directory=staging)
+	try:
+		swap_output_entries(staging, CONFIG.output_dir, entries)
+	except OSError:
+		for manifest_name in (DOCS_MANIFEST_NAME, NOTEBOOKS_MANIFEST_NAME):
+			(CONFIG.cache_dir / manifest_name).unlink(missing_ok=True)
+		raise
+
+
+"""
+ ######  ########  ##     ##
+##    ## ##     ## ##     ##
+##       ##     ## ##     ##
+ ######  ########  ##     ##
+      ## ##   ##    ##   ##
+##    ## ##    ##    ## ##
+ ######  ##     ##    ###
+"""
+# preview server
+# ============================================================
+
+LIVE_RELOAD_PATH: str = "/__livereload"
+"server-sent events endpoint which tells the browser to reload after a rebuild"
+
+_LIVE_RELOAD_SCRIPT: bytes = (
+	f'<script>new EventSource("{LIVE_RELOAD_PATH}")'
+	".onmessage = () => location.reload();</script>"
+).encode()
+
+
+class LiveReload:
+	"""Counts rebuilds, so event streams can wait for the next one"""
+
+	def __init__(self) -> None:
+		"start at generation 0"
+		self.generation: int = 0
+		self.condition: threading.Condition = threading.Condition()
+
+	def notify(self) -> None:
+		"a rebuild finished, wake up every waiting stream"
+		with self.condition:
+			self.generation += 1
+			self.condition.notify_all()
+
+	def wait(self, generation: int, timeout: float) -> int:
+		"wait until the generation is past *generation*, or *timeout*, and return it"
+		with self.condition:
+			self.condition.wait_for(lambda: self.generation != generation, timeout)
+			return self.generation
+
+
+class DocsRequestHandler(http.server.SimpleHTTPRequestHandler):
+	"""`SimpleHTTPRequestHandler` with caching headers, precompressed files, and live reload
+
+	- every file gets `ETag` and `Last-Modified`, and conditional requests get a 304
+	- if the client accepts gzip and an up to date `<file>.gz` exists, that is sent instead
+	- with a `LiveReload` on the server, html pages get a script which reloads
+	them after each rebuild, listening on `LIVE_RELOAD_PATH`
+	"""
+
+	server: DocsServer
+
+	def send_head(self) -> Any:  # noqa: ANN401
+		"like the base class, but serving files ourselves"
+		url_path: str = urllib.parse.urlsplit(self.path).path
+		if url_path == LIVE_RELOAD_PATH and self.server.live_reload is not None:
+			self._stream_reloads(self.server.live_reload)
+			return None
+
+		path: Path = Path(self.translate_path(self.path))
+		if path.is_dir():
+			index: Path = path / "index.html"
+			if not url_path.endswith("/") or not index.is_file():
+				# redirect to "dir/", or directory listing
+				return super().send_head()
+			path = index
+		if not path.is_file():
+			return super().send_head()
+
+		stat: os.stat_result = path.stat()
+		etag: str = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+		if self._not_modified(etag, stat.st_mtime):
+			self.send_response(http.HTTPStatus.NOT_MODIFIED)
+			self.send_header("ETag", etag)
+			self.end_headers()
+			return None
+
+		content_type: str = self.guess_type(path)
+		content_encoding: str | None = None
+		compressed: Path = path.with_name(f"{path.name}.gz")
+		has_compressed: bool = (
+			compressed.is_file() and compressed.stat().st_mtime_ns >= stat.st_mtime_ns
+		)
+		f: BinaryIO
+		if content_type == "text/html" and self.server.live_reload is not None:
+			body: bytes = path.read_bytes()
+			head, sep, tail = body.rpartition(b"</body>")
+			body = (
+				head + _LIVE_RELOAD_SCRIPT + sep + tail
+				if sep
+				else body + _LIVE_RELOAD_SCRIPT
 			)
-			html_exporter: nbconvert.HTMLExporter = nbconvert.HTMLExporter()  # ty: ignore[possibly-missing-attribute]
-			body: str
-			body, _ = html_exporter.from_notebook_node(nb)
-			with open(output_notebook, "w") as f_out:
-				f_out.write(body)
+			f = io.BytesIO(body)
+			length: int = len(body)
+			has_compressed = False
+		elif has_compressed and "gzip" in self.headers.get("Accept-Encoding", ""):
+			f = open(compressed, "rb")  # noqa: SIM115
+			length = os.fstat(f.fileno()).st_size
+			content_encoding = "gzip"
+		else:
+			f = open(path, "rb")  # noqa: SIM115
+			length = stat.st_size
+
+		self.send_response(http.HTTPStatus.OK)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(length))
+		self.send_header("Last-Modified", self.date_time_string(int(stat.st_mtime)))
+		self.send_header("ETag", etag)
+		# always revalidate, docs change on every rebuild
+		self.send_header("Cache-Control", "no-cache")
+		if has_compressed:
+			self.send_header("Vary", "Accept-Encoding")
+		if content_encoding is not None:
+			self.send_header("Content-Encoding", content_encoding)
+		self.end_headers()
+		return f
+
+	def _not_modified(self, etag: str, mtime: float) -> bool:
+		"check `If-None-Match`, or failing that `If-Modified-Since`"
+		if_none_match: str | None = self.headers.get("If-None-Match")
+		if if_none_match is not None:
+			return etag in (tag.strip() for tag in if_none_match.split(","))
+		if_modified_since: str | None = self.headers.get("If-Modified-Since")
+		if if_modified_since is not None:
+			try:
+				since: float = email.utils.parsedate_to_datetime(
+					if_modified_since
+				).timestamp()
+			except (TypeError, ValueError, IndexError, OverflowError):
+				return False
+			return int(mtime) <= since
+		return False
+
+	def _stream_reloads(self, live_reload: LiveReload) -> None:
+		"send an event after every rebuild, until the browser goes away"
+		self.send_response(http.HTTPStatus.OK)
+		self.send_header("Content-Type", "text/event-stream")
+		self.send_header("Cache-Control", "no-cache")
+		self.end_headers()
+		generation: int = live_reload.generation
+		try:
+			while True:
+				new_generation: int = live_reload.wait(generation, timeout=15)
+				if new_generation != generation:
+					generation = new_generation
+					self.wfile.write(b"data: reload\n\n")
+				else:
+					# keepalive, also how we notice the browser is gone
+					self.wfile.write(b": ping\n\n")
+				self.wfile.flush()
+		except (BrokenPipeError, ConnectionResetError):
+			pass
+
+
+class DocsServer(http.server.ThreadingHTTPServer):
+	"""`ThreadingHTTPServer` for `DocsRequestHandler`, optionally with live reload"""
+
+	live_reload: LiveReload | None = None
+
+
+def _mtime_ns(path: Path) -> int | None:
+	"modification time of *path*, `None` if it was removed"
+	try:
+		return path.stat().st_mtime_ns
+	except OSError:
+		return None
+
+
+def _watched_files() -> dict[Path, int]:
+	"modification times of everything a rebuild depends on"
+	paths: list[Path] = [CONFIG_PATH]
+	spec = importlib.util.find_spec(CONFIG.module_name)
+	if spec is not None:
+		for location in spec.submodule_search_locations or []:
+			paths.extend(Path(location).rglob("*.py"))
+		if spec.origin is not None and spec.submodule_search_locations is None:
+			paths.append(Path(spec.origin))
+	templates: Path = CONFIG.output_dir / "resources/templates"
+	paths.extend(p for p in templates.rglob("*") if p.is_file())
+	if CONFIG.notebooks_enabled:
+		paths.extend(CONFIG.notebooks_source_path.glob("*.ipynb"))
+
+	mtimes: dict[Path, int | None] = {path: _mtime_ns(path) for path in paths}
+	return {path: mtime for path, mtime in mtimes.items() if mtime is not None}
+
+
+def _watch_and_rebuild(
+	rebuild_command: list[str],
+	live_reload: LiveReload,
+	poll_interval: float,
+) -> None:
+	"poll `_watched_files`, run *rebuild_command* on changes and then notify *live_reload*"
+	print("watching for changes, ctrl+c to stop")
+	mtimes: dict[Path, int] = _watched_files()
+	while True:
+		time.sleep(poll_interval)
+		new_mtimes: dict[Path, int] = _watched_files()
+		if new_mtimes == mtimes:
+			continue
+		changed: list[str] = sorted(
+			p.as_posix()
+			for p in new_mtimes.keys() | mtimes.keys()
+			if new_mtimes.get(p) != mtimes.get(p)
+		)
+		print(f"changed: {', '.join(changed)}, rebuilding")
+		result = subprocess.run(rebuild_command, check=False)  # noqa: S603
+		# snapshot after the rebuild, edits made during it get picked up next time
+		mtimes = _watched_files() if result.returncode == 0 else new_mtimes
+		if result.returncode != 0:
+			print(f"rebuild failed with exit code {result.returncode}")
+			continue
+		live_reload.notify()
+
+
+def serve_docs(
+	output_directory: Path,
+	port: int,
+	rebuild_command: list[str] | None = None,
+	poll_interval: float = 0.5,
+) -> None:
+	"""Serve *output_directory* on *port*, see `DocsRequestHandler`
+
+	with a *rebuild_command*, also watch the sources (see `_watched_files`),
+	run the command when they change, and reload open pages once it's done.
+	the command runs in a fresh process so changed modules are actually
+	reimported, and the manifests keep it incremental.
+	"""
+	handler = functools.partial(DocsRequestHandler, directory=str(output_directory))
+	with DocsServer(("", port), handler) as httpd:
+		thread: threading.Thread = threading.Thread(
+			target=httpd.serve_forever, daemon=True
+		)
+		if rebuild_command is not None:
+			httpd.live_reload = LiveReload()
+		thread.start()
+		print(f"Serving at http://localhost:{port}")
+		try:
+			if httpd.live_reload is not None and rebuild_command is not None:
+				_watch_and_rebuild(rebuild_command, httpd.live_reload, poll_interval)
+			else:
+				thread.join()
+		except KeyboardInterrupt:
+			pass
+		finally:
+			httpd.shutdown()
 
 
 """
@@ -379,39 +1747,80 @@ def convert_notebooks() -> None:
 # ============================================================
 
 
-def pdoc_combined(*modules: str, output_file: Path) -> None:
-	"""Render the documentation for a list of modules into a single HTML file.
+def _render_markdown_module(module_name: str) -> str:
+	"render one module with the markdown templates, see `_init_docs_worker`"
+	return pdoc.render.html_module(
+		_WORKER_ALL_MODULES[module_name],
+		_WORKER_ALL_MODULES,
+	)
+
+
+def _imap_ordered(
+	pool: ProcessPoolExecutor,
+	fn: Callable[[str], str],
+	items: Iterable[str],
+	window: int,
+) -> Iterator[str]:
+	"like `pool.map`, but with at most *window* results in flight, so they can be streamed"
+	pending: deque[Future[str]] = deque()
+	for item in items:
+		pending.append(pool.submit(fn, item))
+		if len(pending) >= window:
+			yield pending.popleft().result()
+	while pending:
+		yield pending.popleft().result()
+
+
+def pdoc_combined(
+	*modules: str,
+	output_file: Path,
+	jobs: int = 1,
+	split: bool = False,
+	warn_all: bool = False,
+) -> None:
+	"""Render the documentation for a list of modules into a single markdown file.
 
 	Args:
 		*modules: Paths or names of the modules to document.
-		output_file: Path to the output HTML file.
+		output_file: Path to the output markdown file.
+		jobs: Number of worker processes to render modules in, 1 renders serially.
+		split: Instead of a single file, write one `<module>.md` per module
+			next to *output_file*.
+		warn_all: Passed on to workers, don't ignore the configured warnings.
 
-	This function will:
-	1. Extract all modules and submodules.
-	2. Generate documentation for each module.
-	3. Combine all module documentation into a single HTML file.
-	4. Write the combined documentation to the specified output file.
+	Modules are rendered in order (in parallel with `jobs > 1`) and each one is
+	written out as soon as it and everything before it are done, so the whole
+	document is never held in memory at once.
 
-	Rendering options can be configured by calling `pdoc.render.configure` in advance.
+	Rendering options can be configured by calling `pdoc.render.configure` in advance,
+	and `use_markdown_format` must have been called.
 
 	"""
-	# Extract all modules and submodules
-	all_modules: dict[str, pdoc.doc.Module] = {}
-	for module_name in pdoc.extract.walk_specs(modules):
-		all_modules[module_name] = pdoc.doc.Module.from_name(module_name)
-
-	# Generate HTML content for each module
-	module_contents: list[str] = []
-	for module in all_modules.values():
-		module_html = pdoc.render.html_module(module, all_modules)
-		module_contents.append(module_html)
-
-	# Combine all module contents
-	combined_content = "\n".join(module_contents)
-
-	# Write the combined content to the output file
-	with output_file.open("w", encoding="utf-8") as f:
-		f.write(combined_content)
+	module_names: list[str] = pdoc.extract.walk_specs(modules)
+
+	def _write(contents: Iterable[str]) -> None:
+		if split:
+			for module_name, content in zip(module_names, contents):
+				(output_file.parent / f"{module_name}.md").write_text(
+					content, encoding="utf-8"
+				)
+		else:
+			with output_file.open("w", encoding="utf-8") as f:
+				for i, content in enumerate(contents):
+					if i:
+						f.write("\n")
+					f.write(content)
+
+	if jobs > 1:
+		with ProcessPoolExecutor(
+			max_workers=jobs,
+			initializer=_init_docs_worker,
+			initargs=(module_names, sys.path.copy(), True, warn_all),
+		) as pool:
+			_write(_imap_ordered(pool, _render_markdown_module, module_names, 2 * jobs))
+	else:
+		_set_worker_modules(module_names)
+		_write(map(_render_markdown_module, module_names))
 
 
 def ignore_warnings() -> None:
@@ -420,6 +1829,24 @@ def ignore_warnings() -> None:
 		warnings.filterwarnings("ignore", message=message)
 
 
+def configure_pdoc(combined: bool) -> None:
+	"configure pdoc rendering from `CONFIG`, with html or markdown templates"
+	pdoc.render.configure(
+		edit_url_map={
+			CONFIG.package_name: CONFIG.package_code_url,
+		},
+		template_directory=(
+			CONFIG.output_dir / "resources/templates/html/"
+			if not combined
+			else CONFIG.output_dir / "resources/templates/markdown/"
+		),
+		show_source=True,
+		math=True,
+		mermaid=True,
+		search=True,
+	)
+
+
 if __name__ == "__main__":
 	# parse args
 	# --------------------------------------------------
@@ -430,6 +1857,18 @@ if __name__ == "__main__":
 		action="store_true",
 		help="Whether to start an HTTP server to serve the documentation",
 	)
+	argparser.add_argument(
+		"--port",
+		"-p",
+		type=int,
+		default=8000,
+		help="Port for --serve (default: 8000)",
+	)
+	argparser.add_argument(
+		"--watch",
+		action="store_true",
+		help="With --serve, rebuild when sources change and reload open pages",
+	)
 	argparser.add_argument(
 		"--warn-all",
 		"-w",
@@ -442,7 +1881,25 @@ if __name__ == "__main__":
 		action="store_true",
 		help="Whether to combine the documentation for multiple modules into a single markdown file",
 	)
+	argparser.add_argument(
+		"--split",
+		action="store_true",
+		help="With --combined, write one markdown file per module (combined/<module>.md) instead of a single file",
+	)
+	argparser.add_argument(
+		"--full",
+		action="store_true",
+		help=f"Re-render every module, ignoring the manifest (<{TOOL_PATH}.cache_dir>/{DOCS_MANIFEST_NAME}) of the previous build",
+	)
+	argparser.add_argument(
+		"--jobs",
+		"-j",
+		type=int,
+		default=1,
+		help="Number of worker processes to render modules and convert notebooks with (default: 1, serial). 0 means one per cpu",
+	)
 	parsed_args = argparser.parse_args()
+	jobs: int = _resolve_jobs(parsed_args.jobs)
 
 	# configure pdoc
 	# --------------------------------------------------
@@ -453,53 +1910,41 @@ if __name__ == "__main__":
 	if not parsed_args.warn_all:
 		ignore_warnings()
 
-	pdoc.render.configure(
-		edit_url_map={
-			CONFIG.package_name: CONFIG.package_code_url,
-		},
-		template_directory=(
-			CONFIG.output_dir / "resources/templates/html/"
-			if not parsed_args.combined
-			else CONFIG.output_dir / "resources/templates/markdown/"
-		),
-		show_source=True,
-		math=True,
-		mermaid=True,
-		search=True,
-	)
+	configure_pdoc(parsed_args.combined)
 
 	print(json.dumps(asdict(CONFIG), indent=2))
 
 	# do the rendering
 	# --------------------------------------------------
 	if not parsed_args.combined:
-		pdoc.pdoc(
-			CONFIG.module_name,
-			output_directory=CONFIG.output_dir,
+		build_staged_html_docs(
+			jobs=jobs,
+			full=parsed_args.full,
+			warn_all=parsed_args.warn_all,
 		)
 	else:
 		use_markdown_format()
 		pdoc_combined(
 			CONFIG.module_name,
 			output_file=CONFIG.output_dir / "combined" / f"{CONFIG.package_name}.md",
+			jobs=jobs,
+			split=parsed_args.split,
+			warn_all=parsed_args.warn_all,
 		)
-
-	# convert notebooks if needed
-	if CONFIG.notebooks_enabled:
-		convert_notebooks()
+		if CONFIG.notebooks_enabled:
+			convert_notebooks(jobs=jobs)
 
 	# http server if needed
 	# --------------------------------------------------
 	if parsed_args.serve:
-		import http.server
-		import os
-		import socketserver
-
-		port: int = 8000
-		os.chdir(CONFIG.output_dir)
-		with socketserver.TCPServer(
-			("", port),
-			http.server.SimpleHTTPRequestHandler,
-		) as httpd:
-			print(f"Serving at http://localhost:{port}")
-			httpd.serve_forever()
+		rebuild_command: list[str] | None = None
+		if parsed_args.watch:
+			rebuild_command = [
+				sys.executable,
+				__file__,
+				f"--jobs={jobs}",
+				*(["--warn-all"] if parsed_args.warn_all else []),
+				*(["--combined"] if parsed_args.combined else []),
+				*(["--split"] if parsed_args.split else []),
+			]
+		serve_docs(CONFIG.output_dir, parsed_args.port, rebuild_command)
@@ -0,0 +1,279 @@
+# python project makefile template
+# https://github.com/mivanit/python-project-makefile-template
+# version: 0.5.4
+# license: https://creativecommons.org/licenses/by-sa/4.0/
+
+"""Write precompressed siblings of the text files in the docs directory.
+
+For every html, js, css, and svg file under the docs directory, writes a
+gzipped `<file>.gz` next to it, and a `<file>.br` if the `brotli` package is
+installed. Static hosts and CDNs can serve these directly instead of
+compressing on the fly, and `make docs-serve` uses the `.gz` files too.
+
+Compressed files get the modification time of their source, and are skipped
+when that still matches. Compressed files whose source is gone are removed.
+
+Only generated outputs are touched: the *skip* paths (like the resources dir)
+and anything matching the `[tool.makefile.docs.no_clean]` patterns in
+pyproject.toml are left alone, since they may hold committed `.gz`/`.br` files.
+
+Usage: python compress_docs.py <docs_dir> [skip...] [--pyproject P] [--jobs N] [--level L]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import reduce
+from pathlib import Path
+from typing import Any, cast
+
+try:
+	import tomllib  # type: ignore[import-not-found] # pyright: ignore[reportMissingImports]
+except ImportError:
+	import tomli as tomllib  # type: ignore[import-untyped,import-not-found,no-redef] # pyright: ignore[reportMissingImports]
+
+brotli: Any
+try:
+	import brotli  # type: ignore[import-not-found,no-redef] # pyright: ignore[reportMissingImports]
+except ImportError:
+	brotli = None
+
+TOOL_PATH: str = "tool.makefile.docs"
+
+COMPRESS_SUFFIXES: tuple[str, ...] = (".html", ".js", ".css", ".svg")
+"files with these suffixes get compressed siblings"
+
+MIN_SIZE: int = 256
+"files smaller than this are not worth compressing"
+
+
+def deep_get(
+	d: dict[str, Any],
+	path: str,
+	default: Any = None,  # noqa: ANN401
+	sep: str = ".",
+) -> Any:  # noqa: ANN401
+	"""Get nested dictionary value via separated path with default."""
+	return reduce(
+		lambda x, y: x.get(y, default) if isinstance(x, dict) else default,  # function
+		path.split(sep) if isinstance(path, str) else path,  # sequence
+		d,  # initial
+	)
+
+
+def read_no_clean(pyproject_path: Path) -> list[str]:
+	"read the `no_clean` patterns from pyproject.toml, empty if it doesn't exist"
+	if not pyproject_path.is_file():
+		return []
+	with pyproject_path.open("rb") as f:
+		config: dict[str, Any] = cast("dict[str, Any]", tomllib.load(f))  # pyright: ignore[reportUnknownMemberType]
+	return list(deep_get(config, f"{TOOL_PATH}.no_clean", []))
+
+
+def _translate_glob(pattern: str) -> str:
+	"same as `_translate_glob` in docs_clean.py: `*` doesn't match `/`, `**` does"
+	parts: list[str] = []
+	i: int = 0
+	while i < len(pattern):
+		c: str = pattern[i]
+		if pattern.startswith("**/", i):
+			parts.append("(?:.*/)?")
+			i += 3
+			continue
+		if pattern.startswith("**", i):
+			parts.append(".*")
+			i += 2
+			continue
+		if c == "*":
+			parts.append("[^/]*")
+		elif c == "?":
+			parts.append("[^/]")
+		elif c == "[" and "]" in pattern[i + 1 :]:
+			end: int = pattern.index("]", i + 1)
+			body: str = pattern[i + 1 : end]
+			parts.append(f"[^/{body[1:]}]" if body.startswith("!") else f"[{body}]")
+			i = end
+		else:
+			parts.append(re.escape(c))
+		i += 1
+	return "".join(parts)
+
+
+def compile_skipped(patterns: list[str], paths: list[str]) -> re.Pattern[str]:
+	"""compile what not to touch into one regex, matched against posix paths relative to the docs dir
+
+	*patterns* are `no_clean` globs, with the same meaning as in docs_clean.py.
+	*paths* are exact paths relative to the docs dir, anchored there. a
+	matching directory is skipped whole.
+	"""
+	regexes: list[str] = []
+	for pattern in patterns:
+		pattern = pattern.strip("/")  # noqa: PLW2901
+		if pattern:
+			anchor: str = "" if "/" in pattern else "(?:.*/)?"
+			regexes.append(f"{anchor}{_translate_glob(pattern)}")
+	regexes.extend(re.escape(path.strip("/")) for path in paths if path.strip("/"))
+	if not regexes:
+		# matches nothing
+		return re.compile(r"(?!)")
+	return re.compile(f"(?:{'|'.join(regexes)})(?:/.*)?", re.DOTALL)
+
+
+def compressed_suffixes() -> tuple[str, ...]:
+	"suffixes of the compressed files we write, `.br` only if brotli is installed"
+	return (".gz", ".br") if brotli is not None else (".gz",)
+
+
+def compress_file(path: Path, level: int = 9) -> bool:
+	"""write compressed siblings of *path* if they are missing or stale
+
+	returns whether anything was written
+	"""
+	stat: os.stat_result = path.stat()
+	targets: list[Path] = [
+		path.with_name(path.name + suffix) for suffix in compressed_suffixes()
+	]
+	stale: list[Path] = [
+		target
+		for target in targets
+		if not target.is_file() or target.stat().st_mtime_ns != stat.st_mtime_ns
+	]
+	if not stale:
+		return False
+
+	data: bytes = path.read_bytes()
+	for target in stale:
+		if target.suffix == ".gz":
+			# mtime=0 so the output doesn't change unless the input does
+			compressed: bytes = gzip.compress(data, compresslevel=level, mtime=0)
+		else:
+			compressed = brotli.compress(data, quality=min(level + 2, 11))
+		# written next to the target and renamed into place, so a server never
+		# sees a partial file, and it never looks fresh without its contents
+		tmp: Path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+		tmp.write_bytes(compressed)
+		os.utime(tmp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+		tmp.replace(target)
+	return True
+
+
+def find_files(
+	docs_dir: Path,
+	skipped: re.Pattern[str] | None = None,
+) -> tuple[list[Path], list[Path]]:
+	"""walk *docs_dir*, returning files to compress and orphaned compressed files
+
+	orphans are compressed files we would have written, but whose source is gone.
+	paths matching *skipped* (see `compile_skipped`) are neither, and skipped
+	directories are not walked.
+	"""
+	skipped = skipped or compile_skipped([], [])
+	sources: list[Path] = []
+	orphans: list[Path] = []
+	for root, dirs, files in os.walk(docs_dir):
+		rel_root: str = Path(root).relative_to(docs_dir).as_posix()
+		rel_prefix: str = "" if rel_root == "." else f"{rel_root}/"
+		dirs[:] = [d for d in dirs if not skipped.fullmatch(rel_prefix + d)]
+		names: set[str] = set(files)
+		for name in files:
+			if skipped.fullmatch(rel_prefix + name):
+				continue
+			path: Path = Path(root) / name
+			if name.endswith(compressed_suffixes()):
+				source_name: str = name.rsplit(".", 1)[0]
+				if source_name.endswith(COMPRESS_SUFFIXES) and source_name not in names:
+					orphans.append(path)
+			elif name.endswith(COMPRESS_SUFFIXES) and path.stat().st_size >= MIN_SIZE:
+				sources.append(path)
+	return sources, orphans
+
+
+def main(
+	docs_dir: Path,
+	jobs: int = 0,
+	level: int = 9,
+	skip: list[Path] | None = None,
+	pyproject_path: Path | None = None,
+) -> None:
+	"compress the generated files under *docs_dir* in a process pool, see module docstring"
+	if not docs_dir.is_dir():
+		msg: str = f"Docs directory '{docs_dir}' not found"
+		raise FileNotFoundError(msg)
+
+	# skip paths are given relative to the cwd, not the docs dir
+	# those outside the docs dir are never walked anyway
+	skip_rel: list[str] = [
+		path.relative_to(docs_dir).as_posix()
+		for path in skip or []
+		if path.is_relative_to(docs_dir)
+	]
+	patterns: list[str] = read_no_clean(pyproject_path) if pyproject_path else []
+
+	sources: list[Path]
+	orphans: list[Path]
+	sources, orphans = find_files(docs_dir, compile_skipped(patterns, skip_rel))
+	for orphan in orphans:
+		orphan.unlink()
+
+	n_written: int
+	if jobs == 1 or len(sources) < 2:
+		n_written = sum(compress_file(path, level) for path in sources)
+	else:
+		with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+			n_written = sum(
+				pool.map(
+					compress_file,
+					sources,
+					[level] * len(sources),
+					chunksize=16,
+				)
+			)
+
+	print(
+		f"compressed {n_written} of {len(sources)} files in '{docs_dir}' "
+		f"to {', '.join(compressed_suffixes())}, removed {len(orphans)} stale"
+	)
+
+
+if __name__ == "__main__":
+	parser: argparse.ArgumentParser = argparse.ArgumentParser(
+		description="Write precompressed .gz (and .br, with brotli) siblings of docs files",
+	)
+	_ = parser.add_argument("docs_dir", type=Path, help="docs directory to compress")
+	_ = parser.add_argument(
+		"skip",
+		type=Path,
+		nargs="*",
+		help="paths (relative to the cwd) to leave alone, like the resources dir",
+	)
+	_ = parser.add_argument(
+		"--pyproject",
+		type=Path,
+		default=None,
+		help="pyproject.toml to read `no_clean` patterns from, which are left alone too",
+	)
+	_ = parser.add_argument(
+		"--jobs",
+		"-j",
+		type=int,
+		default=0,
+		help="number of worker processes, 0 (default) for one per cpu",
+	)
+	_ = parser.add_argument(
+		"--level",
+		type=int,
+		default=9,
+		help="gzip compression level, 1-9 (default: 9)",
+	)
+	args: argparse.Namespace = parser.parse_args()
+	main(
+		args.docs_dir,
+		jobs=args.jobs,
+		level=args.level,
+		skip=args.skip,
+		pyproject_path=args.pyproject,
+	)
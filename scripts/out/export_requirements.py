@@ -8,13 +8,25 @@
 Reads [tool.makefile.uv-exports] from pyproject.toml and generates uv export
 commands for each configured export. Output is shell commands printed to stdout.
 
-Usage: python export_requirements.py <pyproject_path> <output_dir>
+With `--run`, runs the exports itself in a thread pool instead, skipping any
+whose requirements file is already up to date with `uv.lock` and the export's
+configuration. With `--check`, exports into memory and prints a unified diff
+for each requirements file which is out of date, exiting with 1 if any are.
+
+Usage: python export_requirements.py <pyproject_path> <output_dir> [--run [--force] | --check] [--jobs N]
 """
 
 from __future__ import annotations
 
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import subprocess
 import sys
 import warnings
+from concurrent.futures import Future, ThreadPoolExecutor
 
 try:
 	import tomllib  # type: ignore[import-not-found] # pyright: ignore[reportMissingImports]
@@ -41,21 +53,23 @@ def deep_get(
 	)
 
 
-def export_configuration(
+def export_command(
 	export: dict[str, Any],
 	all_groups: list[str],
 	all_extras: list[str],
 	export_opts: dict[str, Any],
-	output_dir: Path,
-) -> None:
-	"print to console a uv command for make which will export a requirements.txt file"
+) -> tuple[list[str], str] | None:
+	"""get the uv command and output filename for one export configuration
+
+	returns `None` (with a warning) if the configuration has no valid name
+	"""
 	# get name and validate
 	name = export.get("name")
 	if not name or not name.isalnum():
 		warnings.warn(
 			f"Export configuration missing valid 'name' field {export}",
 		)
-		return
+		return None
 
 	# get other options with default fallbacks
 	filename: str = export.get("filename") or f"requirements-{name}.txt"
@@ -95,16 +109,16 @@ def export_configuration(
 	# add extra options
 	cmd.extend(options)
 
-	# assemble the command and print to console -- makefile will run it
-	output_path = output_dir / filename
-	print(f"{' '.join(cmd)} > {output_path.as_posix()}")
+	return cmd, filename
 
 
-def main(
-	pyproject_path: Path,
-	output_dir: Path,
-) -> None:
-	"export to requirements.txt files based on pyproject.toml configuration"
+def shell_command(cmd: list[str], output_path: Path) -> str:
+	"a uv export command for make to run, redirecting to *output_path*"
+	return f"{' '.join(cmd)} > {output_path.as_posix()}"
+
+
+def read_exports(pyproject_path: Path) -> list[tuple[list[str], str]]:
+	"the uv command and output filename of every valid export configured in *pyproject_path*"
 	# read pyproject.toml
 	with open(pyproject_path, "rb") as f:
 		pyproject_data: dict[str, Any] = cast("dict[str, Any]", tomllib.load(f))  # pyright: ignore[reportUnknownMemberType]
@@ -123,19 +137,246 @@ def main(
 	if not exports:
 		exports = [{"name": "all", "groups": [], "extras": [], "options": []}]
 
-	# export each configuration
+	commands: list[tuple[list[str], str]] = []
 	for export in exports:
-		export_configuration(
+		command: tuple[list[str], str] | None = export_command(
 			export=export,
 			all_groups=all_groups,
 			all_extras=all_extras,
 			export_opts=export_opts,
-			output_dir=output_dir,
 		)
+		if command is not None:
+			commands.append(command)
+	return commands
+
+
+def run_uv_export(cmd: list[str], locked: bool = False) -> bytes:
+	"""run a uv export command, returning what it writes to stdout
+
+	with *locked*, uv fails instead of updating an out of date `uv.lock`. this is
+	passed through the environment, since uv echoes its arguments in the output
+	"""
+	env: dict[str, str] | None = None
+	if locked and "--frozen" not in cmd and "UV_FROZEN" not in os.environ:
+		env = {**os.environ, "UV_LOCKED": "1"}
+	result: subprocess.CompletedProcess[bytes] = subprocess.run(  # noqa: S603
+		cmd,
+		capture_output=True,
+		check=False,
+		env=env,
+	)
+	if result.returncode != 0:
+		err_msg: str = f"`{' '.join(cmd)}` failed with exit code {result.returncode}:\n{result.stderr.decode(errors='replace')}"
+		raise RuntimeError(err_msg)
+	return result.stdout
+
+
+HASHES_FILENAME: str = ".export-hashes.json"
+"in the output dir, maps each requirements file to the `export_hash` it was exported with"
+
+
+def export_hash(cmd: list[str], lock: bytes) -> str:
+	"hash of the lock file and the full export command (groups, extras, and options)"
+	h = hashlib.sha256()
+	h.update(lock)
+	h.update(b"\0")
+	h.update(json.dumps(cmd).encode())
+	return h.hexdigest()
+
+
+def run_exports(
+	pyproject_path: Path,
+	output_dir: Path,
+	jobs: int = 0,
+	force: bool = False,
+) -> None:
+	"""run the configured uv exports in a thread pool, writing to *output_dir*
+
+	exports whose requirements file exists and whose `export_hash` (of `uv.lock`
+	next to *pyproject_path*, plus the export's command) matches the one recorded
+	in `HASHES_FILENAME` are skipped, unless *force*
+	"""
+	commands: list[tuple[list[str], str]] = read_exports(pyproject_path)
+	lock_path: Path = pyproject_path.parent / "uv.lock"
+	lock: bytes = lock_path.read_bytes() if lock_path.is_file() else b""
+
+	hashes_path: Path = output_dir / HASHES_FILENAME
+	old_hashes: dict[str, str] = {}
+	if hashes_path.is_file():
+		try:
+			old_hashes = json.loads(hashes_path.read_text(encoding="utf-8"))
+		except ValueError:
+			old_hashes = {}
+
+	new_hashes: dict[str, str] = {
+		filename: export_hash(cmd, lock) for cmd, filename in commands
+	}
+	stale: list[tuple[list[str], str]] = [
+		(cmd, filename)
+		for cmd, filename in commands
+		if force
+		or old_hashes.get(filename) != new_hashes[filename]
+		or not (output_dir / filename).is_file()
+	]
+
+	def _export(command: tuple[list[str], str]) -> None:
+		cmd, filename = command
+		print(shell_command(cmd, output_dir / filename), flush=True)
+		(output_dir / filename).write_bytes(run_uv_export(cmd))
+
+	output_dir.mkdir(parents=True, exist_ok=True)
+	# uv does the work, so threads are enough
+	with ThreadPoolExecutor(max_workers=jobs or None) as pool:
+		futures: dict[str, Future[None]] = {
+			filename: pool.submit(_export, (cmd, filename)) for cmd, filename in stale
+		}
+	failed: dict[str, BaseException] = {
+		filename: exc
+		for filename, future in futures.items()
+		if (exc := future.exception()) is not None
+	}
+
+	# only record hashes of exports which are now up to date
+	hashes_path.write_text(
+		json.dumps(
+			{f: h for f, h in new_hashes.items() if f not in failed},
+			indent=1,
+			sort_keys=True,
+		),
+		encoding="utf-8",
+	)
+
+	print(
+		f"exported {len(stale) - len(failed)} of {len(commands)} requirements files, {len(commands) - len(stale)} up to date"
+	)
+	if failed:
+		for filename, exc in failed.items():
+			print(f"failed to export {filename}: {exc}", file=sys.stderr)
+		sys.exit(1)
+
+
+def check_exports(
+	pyproject_path: Path,
+	output_dir: Path,
+	jobs: int = 0,
+) -> bool:
+	"""check that the requirements files in *output_dir* match a fresh export
+
+	exports into memory (in a thread pool, from `uv.lock` alone, which must be
+	up to date), and prints a unified diff for each file which differs or is
+	missing, plus any `*.txt` files in *output_dir* which no export writes.
+	returns whether everything matched.
+	"""
+	commands: list[tuple[list[str], str]] = read_exports(pyproject_path)
+
+	with ThreadPoolExecutor(max_workers=jobs or None) as pool:
+		futures: dict[str, Future[bytes]] = {
+			filename: pool.submit(run_uv_export, cmd, locked=True)
+			for cmd, filename in commands
+		}
+
+	ok: bool = True
+	for filename, future in futures.items():
+		path: Path = output_dir / filename
+		exc: BaseException | None = future.exception()
+		if exc is not None:
+			print(f"failed to export {filename}: {exc}", file=sys.stderr)
+			ok = False
+			continue
+		expected: str = future.result().decode("utf-8")
+		actual: str = path.read_text(encoding="utf-8") if path.is_file() else ""
+		if expected == actual:
+			continue
+		ok = False
+		sys.stdout.writelines(
+			difflib.unified_diff(
+				actual.splitlines(keepends=True),
+				expected.splitlines(keepends=True),
+				fromfile=path.as_posix() if path.is_file() else "/dev/null",
+				tofile=f"{path.as_posix()} (exported)",
+			)
+		)
+
+	if output_dir.is_dir():
+		for extra in sorted(
+			{p.name for p in output_dir.glob("*.txt")} - futures.keys()
+		):
+			print(f"{(output_dir / extra).as_posix()} is not written by any export")
+			ok = False
+
+	if ok:
+		print(
+			f"all {len(commands)} requirements files in '{output_dir}' are up to date"
+		)
+	else:
+		print(
+			"requirements files are out of date, run `make dep` to update them",
+			file=sys.stderr,
+		)
+	return ok
+
+
+def main(
+	pyproject_path: Path,
+	output_dir: Path,
+) -> None:
+	"print commands to export requirements.txt files based on pyproject.toml configuration"
+	# export each configuration -- makefile will run these
+	for cmd, filename in read_exports(pyproject_path):
+		print(shell_command(cmd, output_dir / filename))
 
 
 if __name__ == "__main__":
-	main(
-		pyproject_path=Path(sys.argv[1]),
-		output_dir=Path(sys.argv[2]),
+	parser: argparse.ArgumentParser = argparse.ArgumentParser(
+		description="Export dependencies to requirements.txt files based on pyproject.toml configuration",
+	)
+	_ = parser.add_argument("pyproject_path", type=Path, help="path to pyproject.toml")
+	_ = parser.add_argument(
+		"output_dir", type=Path, help="directory to write requirements files to"
+	)
+	_ = parser.add_argument(
+		"--run",
+		action="store_true",
+		help="run the exports in a thread pool instead of printing the commands, skipping ones which are up to date",
+	)
+	_ = parser.add_argument(
+		"--check",
+		action="store_true",
+		help="export into memory and diff against the files in output_dir, failing if any differ. needs only an up to date uv.lock",
 	)
+	_ = parser.add_argument(
+		"--jobs",
+		"-j",
+		type=int,
+		default=0,
+		help="with --run or --check, number of exports to run at once, 0 (default) for one per cpu",
+	)
+	_ = parser.add_argument(
+		"--force",
+		action="store_true",
+		help="with --run, export even if up to date",
+	)
+	args: argparse.Namespace = parser.parse_args()
+
+	if args.check:
+		sys.exit(
+			0
+			if check_exports(
+				pyproject_path=args.pyproject_path,
+				output_dir=args.output_dir,
+				jobs=args.jobs,
+			)
+			else 1
+		)
+	elif args.run:
+		run_exports(
+			pyproject_path=args.pyproject_path,
+			output_dir=args.output_dir,
+			jobs=args.jobs,
+			force=args.force,
+		)
+	else:
+		main(
+			pyproject_path=args.pyproject_path,
+			output_dir=args.output_dir,
+		)
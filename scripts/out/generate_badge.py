@@ -13,20 +13,50 @@ Examples:
     python generate_badge.py --label "version" --value "1.2.3"
     python generate_badge.py --label "license" --value "MIT" --color blue
 
-    # Coverage badge (reads from coverage.txt report)
+    # Coverage badge (reads a coverage.txt, coverage.json, or coverage.xml report)
     python generate_badge.py --coverage coverage.txt
+    python generate_badge.py --coverage coverage.json
 
-    # Tests badge (parses pytest output)
+    # Tests badge (parses pytest output, or a `pytest --junitxml` report)
     python generate_badge.py --pytest-results .pytest_results.txt
+    python generate_badge.py --junit-xml junit.xml
+
+    # Many badges in one run, each written to its own path
+    python generate_badge.py --manifest badges.toml
+
+Manifest format (paths are relative to the manifest), one table per badge,
+with the same keys as the options above. Files whose content would not
+change are not rewritten, so their mtimes (and static hosting caches) stay valid:
+
+    [[badge]]
+    output = "docs/coverage/coverage.svg"
+    coverage = "docs/coverage/coverage.txt"
+
+    [[badge]]
+    output = "docs/badges/version.svg"
+    label = "version"
+    value = "1.2.3"
+    color = "blue"
 
 """
 
 from __future__ import annotations
 
 import argparse
+import base64
+import functools
+import hashlib
+import json
 import re
 import sys
+import xml.etree.ElementTree as ET
 from pathlib import Path
+from typing import Any, cast
+
+try:
+	import tomllib  # type: ignore[import-not-found] # pyright: ignore[reportMissingImports]
+except ImportError:
+	import tomli as tomllib  # type: ignore[import-untyped,import-not-found,no-redef] # pyright: ignore[reportMissingImports]
 
 # Color presets (GitHub badge style)
 COLORS: dict[str, str] = {
@@ -64,27 +94,38 @@ def get_tests_color(passed: int, failed: int) -> str:
 		return COLORS["gray"]
 
 
+# advance widths of DejaVu Sans at 11px, in tenths of a pixel, indexed by codepoint,
+# for U+0000 to U+017F (Basic Latin, Latin-1 Supplement, Latin Extended-A), with
+# control characters as 0. generated from the `cmap` and `hmtx` tables of
+# DejaVuSans.ttf (2048 units per em) as `round(advance * 11 * 10 / 2048)`, no kerning
+_CHAR_WIDTHS: bytes = base64.b64decode(
+	"AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAjLDNcRmlWHisrN1wjKCMlRkZGRkZGRkZG"
+	"RiUlXFxcOm5LS01VRj9VUyAgSD1fUldCV0xGQ1FLbUtDSyslK1w3N0NGPEZEJ0ZGHx9AH2tGQ0ZG"
+	"LTkrRkFaQUE6RiVGXAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAACMsRkZGRiU3N240"
+	"Q1wobjc3XCwsN0ZGIzcsNENra2s6S0tLS0tLa01GRkZGICAgIFVSV1dXV1dcV1FRUVFDQ0VDQ0ND"
+	"Q0NsPEREREQfHx8fQ0ZDQ0NDQ1xDRkZGRkFGQUtDS0NLQ008TTxNPE08VUZVRkZERkRGREZERkRV"
+	"RlVGVUZVRlNGZUwgHyAfIB8gHyAfQT0gH0hAQD0fPR89KT0mPh9SRlJGUkZZUkZXQ1dDV0N2cUwt"
+	"TC1MLUY5RjlGOUY5QytDK0MrUUZRRlFGUUZRRlFGbVpDQUNLOks6Szon"
+)
+
+CHAR_WIDTHS: bytes = _CHAR_WIDTHS + bytes([max(_CHAR_WIDTHS)])
+"""`_CHAR_WIDTHS`, plus a last entry for all codepoints past the table
+
+the fallback is the widest glyph, since overestimating pads the badge a little
+while underestimating crops the text
+"""
+
+_FALLBACK_INDEX: int = len(CHAR_WIDTHS) - 1
+
+
+@functools.lru_cache(maxsize=1024)
 def estimate_text_width(text: str) -> int:
 	"""Estimate text width in pixels for the badge font.
 
-	Uses approximate character widths for DejaVu Sans 11px.
+	Sums the DejaVu Sans 11px advance widths in `CHAR_WIDTHS`, and adds padding.
 	"""
-	# Approximate widths for common characters
-	narrow_chars = "iIl1|!.,;:'"
-	wide_chars = "mwMWOQGD%@"
-
-	width = 0
-	for char in text:
-		if char in narrow_chars:
-			width += 4
-		elif char in wide_chars:
-			width += 10
-		elif char.isupper():
-			width += 8
-		else:
-			width += 7
-
-	return width + 10  # Add padding
+	tenths = sum(CHAR_WIDTHS[min(ord(char), _FALLBACK_INDEX)] for char in text)
+	return -(-tenths // 10) + 10  # round up, then add padding
 
 
 def generate_badge_svg(label: str, value: str, color: str) -> str:
@@ -151,6 +192,107 @@ def read_coverage_from_txt(coverage_path: Path) -> float:
 	raise RuntimeError(msg)
 
 
+def read_coverage_from_json(coverage_path: Path) -> float:
+	"""Read coverage percentage from a `coverage json` report.
+
+	Uses the same rounding as `coverage report` where available.
+
+	Args:
+		coverage_path: Path to coverage.json file
+
+	Returns:
+		Coverage percentage (0-100)
+
+	"""
+	totals = json.loads(coverage_path.read_text()).get("totals", {})
+	if "percent_covered_display" in totals:
+		return float(totals["percent_covered_display"])
+	if "percent_covered" in totals:
+		return float(totals["percent_covered"])
+
+	msg = f"Could not find totals.percent_covered in {coverage_path}"
+	raise RuntimeError(msg)
+
+
+def read_coverage_from_xml(coverage_path: Path) -> float:
+	"""Read coverage percentage from a `coverage xml` (Cobertura) report.
+
+	Only the attributes of the root element are read, so the rest of the file
+	is never parsed.
+
+	Args:
+		coverage_path: Path to coverage.xml file
+
+	Returns:
+		Coverage percentage (0-100)
+
+	"""
+	with coverage_path.open("rb") as f:
+		# a report `coverage xml` just wrote, not untrusted input
+		for _event, elem in ET.iterparse(f, events=("start",)):  # noqa: S314
+			attrs = elem.attrib
+			if "lines-valid" in attrs:
+				# lines and branches together, like `coverage report`
+				covered = int(attrs["lines-covered"]) + int(
+					attrs.get("branches-covered", 0)
+				)
+				valid = int(attrs["lines-valid"]) + int(attrs.get("branches-valid", 0))
+				return 100.0 * covered / valid if valid else 100.0
+			if "line-rate" in attrs:
+				return 100.0 * float(attrs["line-rate"])
+			break
+
+	msg = f"Could not parse coverage percentage from {coverage_path}"
+	raise RuntimeError(msg)
+
+
+def read_coverage(coverage_path: Path) -> float:
+	"""Read coverage percentage from a text, json, or xml report, by file suffix."""
+	if coverage_path.suffix == ".json":
+		return read_coverage_from_json(coverage_path)
+	if coverage_path.suffix == ".xml":
+		return read_coverage_from_xml(coverage_path)
+	return read_coverage_from_txt(coverage_path)
+
+
+def parse_junit_xml(junit_path: Path) -> tuple[int, int, int]:
+	"""Count test results in a JUnit XML report, like `pytest --junitxml` writes.
+
+	Streams the file with `iterparse`, dropping each test case once counted, so
+	memory use does not grow with the size of the report.
+
+	Args:
+		junit_path: Path to the JUnit XML file
+
+	Returns:
+		Tuple of (passed, failed, total), where errors count as failed
+
+	"""
+	passed = 0
+	failed = 0
+	total = 0
+	parents: list[ET.Element] = []
+	with junit_path.open("rb") as f:
+		# a report pytest just wrote, not untrusted input
+		for event, elem in ET.iterparse(f, events=("start", "end")):  # noqa: S314
+			if event == "start":
+				parents.append(elem)
+				continue
+			_ = parents.pop()
+			if elem.tag != "testcase":
+				continue
+			outcomes = {child.tag for child in elem}
+			total += 1
+			if outcomes & {"failure", "error"}:
+				failed += 1
+			elif "skipped" not in outcomes:
+				passed += 1
+			if parents:
+				parents[-1].remove(elem)
+
+	return passed, failed, total
+
+
 def parse_pytest_results(results_path: Path) -> tuple[int, int, int]:
 	"""Parse pytest output to get test counts.
 
@@ -216,6 +358,154 @@ def resolve_color(color_input: str) -> str:
 	return f"#{color_input}"
 
 
+def badge_values(
+	label: str | None = None,
+	value: str | None = None,
+	color: str = "gray",
+	coverage: Path | None = None,
+	pytest_results: Path | None = None,
+	junit_xml: Path | None = None,
+) -> tuple[str, str, str]:
+	"""Get the label, value, and color of a badge in coverage, tests, or generic mode.
+
+	Returns:
+		Tuple of (label, value, color)
+
+	"""
+	if coverage:
+		# Coverage mode
+		if not coverage.exists():
+			msg = f"Coverage file not found: {coverage}"
+			raise FileNotFoundError(msg)
+
+		percent = read_coverage(coverage)
+		return "coverage", f"{percent:.0f}%", get_coverage_color(percent)
+
+	if pytest_results or junit_xml:
+		# Tests mode
+		results = cast("Path", pytest_results or junit_xml)
+		if not results.exists():
+			msg = f"Pytest results file not found: {results}"
+			raise FileNotFoundError(msg)
+
+		if junit_xml:
+			passed, failed, total = parse_junit_xml(junit_xml)
+		else:
+			passed, failed, total = parse_pytest_results(results)
+		if failed > 0:
+			value = f"{passed}/{total} passed"
+		else:
+			value = f"{passed} passed"
+		return "tests", value, get_tests_color(passed, failed)
+
+	if label and value:
+		# Generic mode
+		return label, value, resolve_color(color)
+
+	msg = "Must specify either coverage, pytest results, junit xml, or both label and value"
+	raise ValueError(msg)
+
+
+MANIFEST_KEYS: set[str] = {
+	"output",
+	"label",
+	"value",
+	"color",
+	"coverage",
+	"pytest_results",
+	"junit_xml",
+}
+"keys allowed in each `[[badge]]` table of a manifest"
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+	"""Write *content* to *path* unless the file already has the same content hash.
+
+	Returns:
+		Whether the file was written
+
+	"""
+	data = content.encode("utf-8")
+	if (
+		path.is_file()
+		and hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest()
+	):
+		return False
+	path.parent.mkdir(parents=True, exist_ok=True)
+	path.write_bytes(data)
+	return True
+
+
+def render_manifest_badge(badge: dict[str, Any], base: Path) -> bool:
+	"""Render one `[[badge]]` entry of a manifest.
+
+	Args:
+		badge: The entry, with paths relative to *base*
+		base: Directory containing the manifest
+
+	Returns:
+		Whether the file was written
+
+	"""
+	unknown = set(badge) - MANIFEST_KEYS
+	if unknown:
+		msg = (
+			f"unknown keys {sorted(unknown)}, expected some of {sorted(MANIFEST_KEYS)}"
+		)
+		raise ValueError(msg)
+	if "output" not in badge:
+		msg = "missing `output`"
+		raise ValueError(msg)
+	label, value, color = badge_values(
+		label=badge.get("label"),
+		value=badge.get("value"),
+		color=badge.get("color", "gray"),
+		coverage=base / badge["coverage"] if "coverage" in badge else None,
+		pytest_results=base / badge["pytest_results"]
+		if "pytest_results" in badge
+		else None,
+		junit_xml=base / badge["junit_xml"] if "junit_xml" in badge else None,
+	)
+	svg = generate_badge_svg(label, value, color)
+	return write_if_changed(base / badge["output"], svg)
+
+
+def _render_or_report(badge: dict[str, Any], base: Path, where: str) -> bool | None:
+	"""`render_manifest_badge`, but reporting any error to stderr and returning `None`"""
+	try:
+		return render_manifest_badge(badge, base)
+	except Exception as e:
+		print(f"Error: {where}: {e}", file=sys.stderr)
+		return None
+
+
+def generate_from_manifest(manifest_path: Path) -> int:
+	"""Render every badge in a manifest, see the module docstring for the format.
+
+	Badges which fail are reported to stderr, and the rest are still written.
+
+	Returns:
+		Exit code, 1 if any badge failed
+
+	"""
+	with manifest_path.open("rb") as f:
+		manifest = cast("dict[str, Any]", tomllib.load(f))  # pyright: ignore[reportUnknownMemberType]
+	badges = cast("list[dict[str, Any]]", manifest.get("badge", []))
+	base = manifest_path.parent
+
+	results = [
+		_render_or_report(badge, base, f"badge {i} in {manifest_path}")
+		for i, badge in enumerate(badges)
+	]
+	n_written = results.count(True)
+	n_failed = results.count(None)
+
+	print(
+		f"wrote {n_written} of {len(badges)} badges ({len(badges) - n_written - n_failed} unchanged, {n_failed} failed)"
+	)
+	return 1 if n_failed else 0
+
+
 def main() -> int:
 	parser = argparse.ArgumentParser(
 		description="Generate GitHub-style SVG badges",
@@ -246,7 +536,7 @@ def main() -> int:
 		"--coverage",
 		type=Path,
 		metavar="PATH",
-		help="Path to coverage.txt report",
+		help="Path to coverage report: coverage.txt, or a .json/.xml from `coverage json`/`coverage xml`",
 	)
 
 	# Tests mode
@@ -256,56 +546,50 @@ def main() -> int:
 		metavar="PATH",
 		help="Path to file containing pytest output",
 	)
+	_ = parser.add_argument(
+		"--junit-xml",
+		type=Path,
+		metavar="PATH",
+		help="Path to a JUnit XML report, e.g. from `pytest --junitxml`",
+	)
+
+	# Manifest mode
+	_ = parser.add_argument(
+		"--manifest",
+		type=Path,
+		metavar="PATH",
+		help="Path to a toml manifest of badges to write, see below",
+	)
 
 	args = parser.parse_args()
 
+	if args.manifest:
+		try:
+			return generate_from_manifest(args.manifest)
+		except Exception as e:
+			print(f"Error: {e}", file=sys.stderr)
+			return 1
+
+	if not (
+		args.coverage
+		or args.pytest_results
+		or args.junit_xml
+		or (args.label and args.value)
+	):
+		parser.error(
+			"Must specify either --coverage, --pytest-results, --junit-xml, --manifest, or both --label and --value"
+		)
+
 	# Determine mode and generate badge
 	try:
-		if args.coverage:
-			# Coverage mode
-			coverage_path = args.coverage
-			if not coverage_path.exists():
-				print(
-					f"Error: Coverage file not found: {coverage_path}", file=sys.stderr
-				)
-				return 1
-
-			percent = read_coverage_from_txt(coverage_path)
-			label = "coverage"
-			value = f"{percent:.0f}%"
-			color = get_coverage_color(percent)
-
-		elif args.pytest_results:
-			# Tests mode
-			if not args.pytest_results.exists():
-				print(
-					f"Error: Pytest results file not found: {args.pytest_results}",
-					file=sys.stderr,
-				)
-				return 1
-
-			passed, failed, total = parse_pytest_results(args.pytest_results)
-			label = "tests"
-
-			if failed > 0:
-				value = f"{passed}/{total} passed"
-			else:
-				value = f"{passed} passed"
-
-			color = get_tests_color(passed, failed)
-
-		elif args.label and args.value:
-			# Generic mode
-			label = args.label
-			value = args.value
-			color = resolve_color(args.color)
-
-		else:
-			parser.error(
-				"Must specify either --coverage, --pytest-results, or both --label and --value"
-			)
-			return 1  # pyright: ignore[reportUnreachable]
-
+		label, value, color = badge_values(
+			label=args.label,
+			value=args.value,
+			color=args.color,
+			coverage=args.coverage,
+			pytest_results=args.pytest_results,
+			junit_xml=args.junit_xml,
+		)
 		svg = generate_badge_svg(label, value, color)
 		print(svg)
 
@@ -5,18 +5,70 @@
 
 """CLI to convert markdown files to HTML using pdoc's markdown2.
 
-Usage: python pdoc_markdown2_cli.py <input.md> <output.html> [--safe-mode escape|replace]
+Usage:
+	python pdoc_markdown2_cli.py <input.md> <output.html> [--safe-mode escape|replace]
+	python pdoc_markdown2_cli.py <inputs or globs...> --out-dir <dir> [--root <dir>] [--jobs N] [--force]
+	python pdoc_markdown2_cli.py --manifest <file or -> [--out-dir <dir>] [--jobs N] [--force]
+
+In batch mode (`--out-dir` or `--manifest`), every file is converted in one
+process (or a pool, with `--jobs`), each process reusing a single `Markdown`
+instance. Outputs newer than their inputs, and last written with the same
+`--safe-mode` and `--encoding`, are skipped unless `--force` is given. The
+options each output was written with are kept in the `--state` file.
+
+A manifest has one `<input.md>` or `<input.md><TAB><output.html>` per line, so
+paths may contain spaces. Lines starting with `#` are comments. Inputs without
+an output go in `--out-dir`. `--manifest -` reads the manifest from stdin, e.g.
+`find . -name '*.md' | python pdoc_markdown2_cli.py --manifest - --out-dir html`.
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
+import glob
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+	from collections.abc import Iterable
+
+try:
+	from pdoc.markdown2 import (  # type: ignore[import-untyped,import-not-found,attr-defined] # pyright: ignore[reportMissingImports]
+		Markdown,  # pyright: ignore[reportUnknownVariableType]
+	)
+except ImportError:
+	# pdoc>=15 no longer vendors markdown2, and depends on the package instead
+	from markdown2 import (  # type: ignore[import-untyped,import-not-found,no-redef] # pyright: ignore[reportMissingImports]
+		Markdown,  # pyright: ignore[reportUnknownVariableType]
+	)
+
+MARKDOWN_EXTRAS: list[str] = [
+	"fenced-code-blocks",
+	"header-ids",
+	"markdown-in-html",
+	"tables",
+]
+"markdown2 extras used for every conversion"
 
-from pdoc.markdown2 import (  # type: ignore[import-untyped,import-not-found,attr-defined] # pyright: ignore[reportMissingImports]
-	Markdown,  # pyright: ignore[reportUnknownVariableType]
-)
+STATE_PATH_DEFAULT: Path = Path(".meta/local/pdoc_markdown2_cli.json")
+"default `--state` file, mapping each batch output to the options it was written with"
+
+
+@functools.cache
+def get_markdown(safe_mode: str | None = None) -> Any:  # noqa: ANN401
+	"""one `Markdown` instance per process and safe mode
+
+	`Markdown.convert` calls `reset()` itself, which clears all per-document
+	state, so the instance can be reused for any number of files
+	"""
+	return Markdown(  # pyright: ignore[reportUnknownVariableType]
+		extras=MARKDOWN_EXTRAS,
+		safe_mode=safe_mode,  # pyright: ignore[reportArgumentType] # ty: ignore[invalid-argument-type]
+	)
 
 
 def convert_file(
@@ -30,23 +82,176 @@ def convert_file(
 	text: str = input_path.read_text(encoding=encoding)
 
 	# Convert to HTML using markdown2
-	markdown: Any = Markdown(  # pyright: ignore[reportUnknownVariableType]
-		extras=["fenced-code-blocks", "header-ids", "markdown-in-html", "tables"],
-		safe_mode=safe_mode,  # pyright: ignore[reportArgumentType] # ty: ignore[invalid-argument-type]
-	)
+	markdown: Any = get_markdown(safe_mode)
 	html: str = str(markdown.convert(text))  # pyright: ignore[reportUnknownMemberType,reportUnknownArgumentType]
 
 	# Write HTML output
+	output_path.parent.mkdir(parents=True, exist_ok=True)
 	output_path.write_text(html, encoding=encoding)
 
 
+def options_key(safe_mode: str | None, encoding: str) -> str:
+	"everything besides the input which changes an output, as stored in the state file"
+	return json.dumps([safe_mode, encoding, MARKDOWN_EXTRAS])
+
+
+def read_state(state_path: Path) -> dict[str, str]:
+	"output path to `options_key` it was written with, empty if missing or unreadable"
+	try:
+		return dict(json.loads(state_path.read_text(encoding="utf-8")))
+	except (OSError, ValueError, TypeError):
+		return {}
+
+
+def is_up_to_date(
+	input_path: Path,
+	output_path: Path,
+	options: str | None = None,
+	state: dict[str, str] | None = None,
+) -> bool:
+	"""whether *output_path* exists and is newer than *input_path*
+
+	and, if *options* are given, whether *state* says it was written with them
+	"""
+	if options is not None and (state or {}).get(output_path.as_posix()) != options:
+		return False
+	try:
+		return output_path.stat().st_mtime_ns >= input_path.stat().st_mtime_ns
+	except FileNotFoundError:
+		return False
+
+
+def expand_inputs(patterns: Iterable[str]) -> list[Path]:
+	"expand globs (`**` is recursive), keeping plain paths as they are, without duplicates"
+	paths: dict[Path, None] = {}
+	for pattern in patterns:
+		if any(c in pattern for c in "*?["):
+			# unlike `Path.glob`, takes absolute patterns and skips hidden files like a shell
+			matches: list[str] = sorted(glob.glob(pattern, recursive=True))  # noqa: PTH207
+			paths.update(dict.fromkeys(Path(p) for p in matches))
+		else:
+			paths[Path(pattern)] = None
+	return list(paths)
+
+
+def read_manifest(lines: Iterable[str]) -> list[tuple[Path, Path | None]]:
+	"parse manifest lines into `(input, output or None)` pairs, see module docstring"
+	entries: list[tuple[Path, Path | None]] = []
+	for raw_line in lines:
+		line: str = raw_line.rstrip("\r\n")
+		if not line.strip() or line.lstrip().startswith("#"):
+			continue
+		parts: list[str] = line.split("\t")
+		if len(parts) > 2:
+			msg: str = f"manifest lines are `<input>[<TAB><output>]`, got {raw_line!r}"
+			raise ValueError(msg)
+		entries.append(
+			(
+				Path(parts[0].strip()),
+				Path(parts[1].strip()) if len(parts) == 2 else None,
+			)
+		)
+	return entries
+
+
+def output_for(input_path: Path, out_dir: Path, root: Path) -> Path:
+	"output path for *input_path* under *out_dir*, keeping its path relative to *root*"
+	try:
+		relative: Path = input_path.resolve().relative_to(root.resolve())
+	except ValueError:
+		relative = Path(input_path.name)
+	return out_dir / relative.with_suffix(".html")
+
+
+def _convert_job(job: tuple[Path, Path, str | None, str]) -> None:
+	"unpack a job for `ProcessPoolExecutor.map`"
+	convert_file(*job)
+
+
+def convert_batch(
+	pairs: list[tuple[Path, Path]],
+	safe_mode: str | None = None,
+	encoding: str = "utf-8",
+	jobs: int = 1,
+	force: bool = False,
+	state_path: Path = STATE_PATH_DEFAULT,
+) -> int:
+	"""convert every `(input, output)` pair, skipping up to date outputs unless *force*
+
+	an output is up to date if it is newer than its input, and was written with
+	the same options, as recorded in *state_path*. with `jobs != 1`, converts
+	in a process pool (`0` means one per cpu). returns the number of files converted.
+	"""
+	options: str = options_key(safe_mode, encoding)
+	state: dict[str, str] = read_state(state_path)
+	stale: list[tuple[Path, Path, str | None, str]] = [
+		(input_path, output_path, safe_mode, encoding)
+		for input_path, output_path in pairs
+		if force or not is_up_to_date(input_path, output_path, options, state)
+	]
+	if jobs == 1 or len(stale) < 2:
+		for job in stale:
+			_convert_job(job)
+	else:
+		with ProcessPoolExecutor(max_workers=jobs or None) as pool:
+			list(pool.map(_convert_job, stale, chunksize=16))
+
+	if stale:
+		state.update(
+			(output_path.as_posix(), options) for _, output_path, _, _ in stale
+		)
+		try:
+			state_path.parent.mkdir(parents=True, exist_ok=True)
+			state_path.write_text(json.dumps(state, indent="\t"), encoding="utf-8")
+		except OSError:
+			# outputs are just converted again next time
+			pass
+	return len(stale)
+
+
 def main() -> None:
 	"cli entry point"
 	parser: argparse.ArgumentParser = argparse.ArgumentParser(
 		description="Convert markdown files to HTML using pdoc's markdown2",
 	)
-	parser.add_argument("input", type=Path, help="Input markdown file path")
-	parser.add_argument("output", type=Path, help="Output HTML file path")
+	parser.add_argument(
+		"paths",
+		nargs="*",
+		help="Input and output file paths, or with --out-dir, any number of input paths or globs",
+	)
+	parser.add_argument(
+		"--out-dir",
+		type=Path,
+		help="Batch mode: write `<input relative to --root>.html` files here",
+	)
+	parser.add_argument(
+		"--root",
+		type=Path,
+		default=Path(),
+		help="With --out-dir, input paths are taken relative to this (default: cwd)",
+	)
+	parser.add_argument(
+		"--manifest",
+		help="Batch mode: read `<input>[<TAB><output>]` lines from this file, or stdin for '-'",
+	)
+	parser.add_argument(
+		"--state",
+		type=Path,
+		default=STATE_PATH_DEFAULT,
+		help=f"Batch mode: file recording the options each output was written with (default: {STATE_PATH_DEFAULT.as_posix()})",
+	)
+	parser.add_argument(
+		"--jobs",
+		"-j",
+		type=int,
+		default=1,
+		help="Batch mode: number of worker processes (default: 1, serial). 0 means one per cpu",
+	)
+	parser.add_argument(
+		"--force",
+		action="store_true",
+		help="Batch mode: convert even if the output is up to date",
+	)
 	parser.add_argument(
 		"--safe-mode",
 		choices=["escape", "replace"],
@@ -60,12 +265,48 @@ def main() -> None:
 
 	args: argparse.Namespace = parser.parse_args()
 
-	convert_file(
-		args.input,
-		args.output,
+	# single file, as before
+	if args.out_dir is None and args.manifest is None:
+		if len(args.paths) != 2:
+			parser.error(
+				"expected <input> <output>, or --out-dir/--manifest for batch mode"
+			)
+		convert_file(
+			Path(args.paths[0]),
+			Path(args.paths[1]),
+			safe_mode=args.safe_mode,
+			encoding=args.encoding,
+		)
+		return
+
+	# batch mode
+	entries: list[tuple[Path, Path | None]] = [
+		(path, None) for path in expand_inputs(args.paths)
+	]
+	if args.manifest is not None:
+		if args.manifest == "-":
+			entries.extend(read_manifest(sys.stdin))
+		else:
+			with open(args.manifest, encoding="utf-8") as f:
+				entries.extend(read_manifest(f))
+
+	pairs: list[tuple[Path, Path]] = []
+	for input_path, output_path in entries:
+		if output_path is None:
+			if args.out_dir is None:
+				parser.error(f"no output given for '{input_path}', and no --out-dir")
+			output_path = output_for(input_path, args.out_dir, args.root)  # noqa: PLW2901
+		pairs.append((input_path, output_path))
+
+	n_converted: int = convert_batch(
+		pairs,
 		safe_mode=args.safe_mode,
 		encoding=args.encoding,
+		jobs=args.jobs,
+		force=args.force,
+		state_path=args.state,
 	)
+	print(f"converted {n_converted} of {len(pairs)} markdown files")
 
 
 if __name__ == "__main__":
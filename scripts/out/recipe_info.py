@@ -10,6 +10,11 @@ dependencies, comments, and echo messages. Supports fuzzy matching
 and wildcard patterns.
 
 Usage: python recipe_info.py [-f makefile] [--all | target1 target2 ...]
+
+Shell completion for `make <TAB>` is served from a cached index of targets and
+variables, see `--complete` and `--completion-script`:
+
+	eval "$(python .meta/scripts/recipe_info.py --completion-script bash)"
 """
 
 from __future__ import annotations
@@ -17,11 +22,15 @@ from __future__ import annotations
 import argparse
 import difflib
 import fnmatch
+import hashlib
+import json
+import os
 import re
+import subprocess
 import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal, cast, overload
+from typing import Any, Literal, cast, overload
 
 
 @overload
@@ -264,6 +273,7 @@ class MakeVariable:
 	raw_value: str  # as written in makefile, e.g., "$(shell git describe)"
 	operator: Literal["=", ":=", "?=", "+="]
 	comments: list[str]  # comments above the definition
+	value: str | None = None  # expanded value, filled in by `attach_evaluated_values`
 
 	@classmethod
 	def from_makefile(
@@ -331,8 +341,13 @@ class MakeVariable:
 			output.append(f"  {c.RED}comments:{c.RESET}")
 			output.extend(f"    {c.GREEN}{line}{c.RESET}" for line in self.comments)
 
-		# Hint for computed values
-		output.append(f"  {c.WHITE}(run 'make info-long' for computed values){c.RESET}")
+		# Value as make expands it, if we have it
+		if self.value is not None:
+			output.append(f"  {c.RED}value:{c.RESET} {c.MAGENTA}{self.value}{c.RESET}")
+		else:
+			output.append(
+				f"  {c.WHITE}(run 'make info-long' for computed values){c.RESET}"
+			)
 
 		return output
 
@@ -380,6 +395,330 @@ def describe_target(makefile_path: Path, target: str) -> None:
 		print(line)
 
 
+# evaluated variable values
+# ============================================================
+
+EVAL_CACHE_PATH_DEFAULT: Path = Path(".meta/local/recipe_info_values.json")
+"cached expanded variable values, valid until the makefile, pyproject.toml, overrides, or environment change"
+
+_EVAL_TARGET: str = "__recipe_info_evaluate__"
+"target added with `--eval`, whose recipe prints the requested values"
+
+_EVAL_MARKER: str = "\x1frecipe_info\x1f"
+"starts each `$(info)` line we print, so values spanning lines can be told apart from other output"
+
+_MAKE_REF_RX: re.Pattern[str] = re.compile(r"\$[({]([A-Za-z_][A-Za-z0-9_]*)")
+"the name at the start of any `$(...)` or `${...}`, used to find environment variables the makefile reads"
+
+
+def evaluate_with_make(makefile_path: Path, names: list[str]) -> dict[str, str]:
+	"""Have make itself expand the variables *names*, in a single run.
+
+	The values are printed with `$(info)` from the recipe of a target added with
+	`--eval`, so they are expanded after the whole makefile is read, exactly as
+	any recipe would see them, function calls such as `$(shell ...)` included.
+	Only that target is built, so no other recipe runs.
+	"""
+	recipe: str = "".join(f"$(info {_EVAL_MARKER}{name}=$({name}))" for name in names)
+	result: subprocess.CompletedProcess[str] = subprocess.run(  # noqa: S603
+		[  # noqa: S607
+			"make",
+			"-s",
+			"--no-print-directory",
+			"-f",
+			str(makefile_path),
+			f"--eval={_EVAL_TARGET}: ; @{recipe}",
+			_EVAL_TARGET,
+		],
+		capture_output=True,
+		text=True,
+		check=False,
+	)
+	values: dict[str, str] = {}
+	name: str | None = None
+	for line in result.stdout.splitlines():
+		if line.startswith(_EVAL_MARKER):
+			name, _, value = line[len(_EVAL_MARKER) :].partition("=")
+			values[name] = value
+		elif name is not None:
+			# a value with newlines, from a `define` block
+			values[name] += "\n" + line
+	return values
+
+
+_HELP_VARIABLES: frozenset[str] = frozenset(("help", "HELP", "h", "H"))
+"variables `make help` reads what to show from, they don't change any values"
+
+
+def _make_overrides(makeflags: str) -> list[str]:
+	"""Command line variable overrides in *makeflags*, except `_HELP_VARIABLES`.
+
+	Make puts them after ` -- `, separated by spaces, with spaces within values
+	escaped by a backslash. The flags before that (`-s`, `--jobserver-auth=...`)
+	don't change values, and some differ from run to run.
+	"""
+	parts: list[str] = re.split(r"(?:^| )-- ", makeflags, maxsplit=1)
+	if len(parts) < 2:
+		return []
+	return [
+		override
+		for override in re.split(r"(?<!\\) ", parts[1])
+		if override
+		and re.split(r"[:+?!]?=", override, maxsplit=1)[0] not in _HELP_VARIABLES
+	]
+
+
+def _eval_cache_stamp(makefile_path: Path) -> dict[str, Any]:
+	"""Everything the values depend on: the makefile, pyproject.toml, overrides, and environment.
+
+	Command line overrides (`make help=X RUN_GLOBAL=1`) reach us via `MAKEFLAGS`,
+	see `_make_overrides`. Of the environment, only variables the makefile refers
+	to (like `XDG_CACHE_HOME`) matter, and only their hash is kept, not their values.
+	Make also exports the overrides, so `_HELP_VARIABLES` are left out here too.
+	"""
+	stamp: dict[str, Any] = {
+		"overrides": _make_overrides(os.environ.get("MAKEFLAGS", "")),
+	}
+	for path in (makefile_path, makefile_path.parent / "pyproject.toml"):
+		if path.is_file():
+			st = path.stat()
+			stamp[path.as_posix()] = [st.st_mtime_ns, st.st_size]
+
+	referenced: set[str] = set(
+		_MAKE_REF_RX.findall(makefile_path.read_text(encoding="utf-8"))
+	)
+	environment: list[tuple[str, str]] = sorted(
+		(name, value)
+		for name, value in os.environ.items()
+		if name in referenced and name not in _HELP_VARIABLES
+	)
+	stamp["environment"] = hashlib.sha256(
+		json.dumps(environment).encode("utf-8")
+	).hexdigest()
+	return stamp
+
+
+def get_evaluated_values(
+	makefile_path: Path, cache_path: Path, names: list[str]
+) -> dict[str, str]:
+	"""Get expanded values of the makefile variables *names*, from the cache if still valid.
+
+	Values missing from the cache are evaluated by make in one run, and added to it.
+	"""
+	stamp: dict[str, Any] = _eval_cache_stamp(makefile_path)
+	values: dict[str, str] = {}
+	try:
+		cached: dict[str, Any] = json.loads(cache_path.read_text(encoding="utf-8"))
+		if cached.get("stamp") == stamp:
+			values = cast("dict[str, str]", cached["values"])
+	except (OSError, ValueError, KeyError):
+		pass
+
+	missing: list[str] = [name for name in names if name not in values]
+	if missing:
+		values.update(evaluate_with_make(makefile_path, missing))
+		try:
+			cache_path.parent.mkdir(parents=True, exist_ok=True)
+			cache_path.write_text(
+				json.dumps(dict(stamp=stamp, values=values)), encoding="utf-8"
+			)
+		except OSError:
+			pass
+	return values
+
+
+def attach_evaluated_values(
+	variables: list[MakeVariable],
+	makefile_path: Path,
+	cache_path: Path = EVAL_CACHE_PATH_DEFAULT,
+) -> None:
+	"""Set `MakeVariable.value` on all *variables* from a single make run."""
+	values: dict[str, str] = get_evaluated_values(
+		makefile_path, cache_path, [var.name for var in variables]
+	)
+	for var in variables:
+		var.value = values.get(var.name)
+
+
+# completion index
+# ============================================================
+
+INDEX_PATH_DEFAULT: Path = Path(".meta/local/recipe_info_index.tsv")
+"cached completion index, one `word<TAB>description` line per target or variable"
+
+_INDEX_HEADER: str = "# recipe_info index v1"
+"first field of the index header line, followed by the makefile stamp"
+
+
+def _makefile_stamp(makefile_path: Path) -> str:
+	"""Identify a version of the makefile by path, mtime and size (no hashing)."""
+	st = makefile_path.stat()
+	return f"{makefile_path.as_posix()}\t{st.st_mtime_ns}\t{st.st_size}"
+
+
+def _one_line(text: str) -> str:
+	"""Make *text* safe to store in a single TSV field."""
+	return " ".join(text.split())
+
+
+def _first_comment(comments: list[str]) -> str:
+	"""First comment line with any actual text (skips `----` separators)."""
+	return next((line for line in comments if any(ch.isalnum() for ch in line)), "")
+
+
+def build_index(lines: list[str]) -> list[tuple[str, str]]:
+	"""Build `(word, description)` completion entries for a makefile.
+
+	Targets are completed by name, variables as `NAME=` since that is the only
+	place they can appear on a `make` command line. The description is the first
+	comment line above the definition, falling back to the echo message for targets.
+	"""
+	entries: list[tuple[str, str]] = []
+	for recipe in get_all_recipes(lines):
+		desc: str = _first_comment(recipe.comments) or recipe.echo_message
+		entries.append((recipe.target, _one_line(desc)))
+
+	for var_name, var_line_idx in find_all_variables(lines).items():
+		var: MakeVariable = MakeVariable.from_makefile(lines, var_name, var_line_idx)
+		desc = _first_comment(var.comments)
+		entries.append((f"{var_name}=", _one_line(desc)))
+
+	return entries
+
+
+def read_index(index_path: Path, makefile_path: Path) -> list[tuple[str, str]] | None:
+	"""Read the cached index, or return `None` if missing or stale."""
+	try:
+		with index_path.open("r", encoding="utf-8") as f:
+			header: str = f.readline().rstrip("\n")
+			if header != f"{_INDEX_HEADER}\t{_makefile_stamp(makefile_path)}":
+				return None
+			return [
+				cast("tuple[str, str]", tuple(line.rstrip("\n").split("\t", 1)))
+				for line in f
+				if "\t" in line
+			]
+	except OSError:
+		return None
+
+
+def write_index(
+	index_path: Path,
+	makefile_path: Path,
+	entries: list[tuple[str, str]],
+) -> None:
+	"""Write the index; failures are ignored since the cache is only an optimization."""
+	contents: str = "".join(
+		[
+			f"{_INDEX_HEADER}\t{_makefile_stamp(makefile_path)}\n",
+			*(f"{word}\t{desc}\n" for word, desc in entries),
+		]
+	)
+	try:
+		index_path.parent.mkdir(parents=True, exist_ok=True)
+		index_path.write_text(contents, encoding="utf-8")
+	except OSError:
+		pass
+
+
+def get_index(makefile_path: Path, index_path: Path) -> list[tuple[str, str]]:
+	"""Get completion entries from the cached index, rebuilding it if stale."""
+	entries: list[tuple[str, str]] | None = read_index(index_path, makefile_path)
+	if entries is None:
+		lines: list[str] = makefile_path.read_text(encoding="utf-8").splitlines()
+		entries = build_index(lines)
+		write_index(index_path, makefile_path, entries)
+	return entries
+
+
+_COMPLETION_SCRIPT_BASH: str = r"""# bash completion for `make`, backed by recipe_info.py
+# enable with:  eval "$(python .meta/scripts/recipe_info.py --completion-script bash)"
+# the index is read directly while it is newer than the makefile and was built
+# from it, otherwise recipe_info.py rebuilds it. falls back to the stock `_make`.
+_recipe_info_make() {
+	local cur="${COMP_WORDS[COMP_CWORD]}"
+	local script=".meta/scripts/recipe_info.py"
+	local index=".meta/local/recipe_info_index.tsv"
+	local makefile="" word desc i tag index_makefile rest
+	for ((i = 1; i < COMP_CWORD; i++)); do
+		if [[ ${COMP_WORDS[i]} == -f || ${COMP_WORDS[i]} == --file ]]; then
+			makefile="${COMP_WORDS[i + 1]}"
+		fi
+	done
+	if [[ -z $makefile ]]; then
+		for makefile in GNUmakefile makefile Makefile; do
+			[[ -f $makefile ]] && break
+		done
+	fi
+	if [[ ! -f $makefile || ! -f $script ]]; then
+		declare -F _make >/dev/null && _make "$@"
+		return
+	fi
+	COMPREPLY=()
+	# the index header is `<tag>\t<makefile path>\t<mtime>\t<size>`, see `_makefile_stamp`
+	[[ -f $index ]] && IFS=$'\t' read -r tag index_makefile rest <"$index"
+	if [[ $index -nt $makefile && $index_makefile == "${makefile#./}" ]]; then
+		while IFS=$'\t' read -r word desc; do
+			[[ $word != "#"* && $word == "$cur"* ]] && COMPREPLY+=("$word")
+		done <"$index"
+	else
+		while IFS=$'\t' read -r word desc; do
+			COMPREPLY+=("$word")
+		done < <("${RECIPE_INFO_PYTHON:-python}" "$script" -f "$makefile" --index "$index" --complete "$cur")
+	fi
+	if [[ ${#COMPREPLY[@]} -eq 1 && ${COMPREPLY[0]} == *= ]]; then
+		compopt -o nospace
+	fi
+}
+complete -F _recipe_info_make make
+"""
+
+_COMPLETION_SCRIPT_ZSH: str = r"""# zsh completion for `make`, backed by recipe_info.py
+# enable (after compinit) with:  eval "$(python .meta/scripts/recipe_info.py --completion-script zsh)"
+# the index is read directly while it is newer than the makefile and was built
+# from it, otherwise recipe_info.py rebuilds it. falls back to the stock `_make`.
+_recipe_info_make() {
+	local script=".meta/scripts/recipe_info.py"
+	local index=".meta/local/recipe_info_index.tsv"
+	local makefile="" word desc i tag index_makefile rest
+	local -a entries
+	for ((i = 2; i < CURRENT; i++)); do
+		if [[ ${words[i]} == -f || ${words[i]} == --file ]]; then
+			makefile="${words[i + 1]}"
+		fi
+	done
+	if [[ -z $makefile ]]; then
+		for makefile in GNUmakefile makefile Makefile; do
+			[[ -f $makefile ]] && break
+		done
+	fi
+	if [[ ! -f $makefile || ! -f $script ]]; then
+		_make "$@"
+		return
+	fi
+	# the index header is `<tag>\t<makefile path>\t<mtime>\t<size>`, see `_makefile_stamp`
+	[[ -f $index ]] && IFS=$'\t' read -r tag index_makefile rest <"$index"
+	if [[ $index -nt $makefile && $index_makefile == "${makefile#./}" ]]; then
+		while IFS=$'\t' read -r word desc; do
+			[[ $word != "#"* ]] && entries+=("${word//:/\\:}:$desc")
+		done <"$index"
+	else
+		while IFS=$'\t' read -r word desc; do
+			entries+=("${word//:/\\:}:$desc")
+		done < <("${RECIPE_INFO_PYTHON:-python}" "$script" -f "$makefile" --index "$index" --complete "")
+	fi
+	_describe -t make-targets 'make target or variable' entries
+}
+compdef _recipe_info_make make
+"""
+
+COMPLETION_SCRIPTS: dict[str, str] = dict(
+	bash=_COMPLETION_SCRIPT_BASH,
+	zsh=_COMPLETION_SCRIPT_ZSH,
+)
+"shell completion scripts, printed by `--completion-script`"
+
+
 def main() -> None:  # noqa: PLR0912, PLR0915, C901
 	"""CLI entry point."""
 	parser: argparse.ArgumentParser = argparse.ArgumentParser(
@@ -403,11 +742,49 @@ def main() -> None:  # noqa: PLR0912, PLR0915, C901
 		action="store_true",
 		help="Disable colored output (color is enabled by default)",
 	)
+	parser.add_argument(
+		"--evaluate",
+		action="store_true",
+		help="Show variable values as make expands them, from a single cached make run",
+	)
+	parser.add_argument(
+		"--eval-cache",
+		type=Path,
+		default=EVAL_CACHE_PATH_DEFAULT,
+		help=f"Path to the cached variable values (default: {EVAL_CACHE_PATH_DEFAULT.as_posix()})",
+	)
+	parser.add_argument(
+		"--complete",
+		metavar="PREFIX",
+		help="Print `word<TAB>description` completion candidates starting with PREFIX, served from the cached index",
+	)
+	parser.add_argument(
+		"--index",
+		type=Path,
+		default=INDEX_PATH_DEFAULT,
+		help=f"Path to the cached completion index (default: {INDEX_PATH_DEFAULT.as_posix()})",
+	)
+	parser.add_argument(
+		"--completion-script",
+		choices=sorted(COMPLETION_SCRIPTS),
+		help="Print a shell completion script for `make` which calls `--complete`",
+	)
 	parser.add_argument(
 		"targets", nargs="*", help="Target or variable names (case-insensitive)"
 	)
 	args: argparse.Namespace = parser.parse_args()
 
+	if args.completion_script:
+		print(COMPLETION_SCRIPTS[args.completion_script], end="")
+		return
+
+	if args.complete is not None:
+		prefix: str = args.complete
+		for word, desc in get_index(Path(args.file), args.index):
+			if word.startswith(prefix):
+				print(f"{word}\t{desc}")
+		return
+
 	lines: list[str] = Path(args.file).read_text(encoding="utf-8").splitlines()
 	c: Colors = Colors(enabled=not args.no_color)
 
@@ -514,6 +891,9 @@ def main() -> None:  # noqa: PLR0912, PLR0915, C901
 	if not recipes and not variables:
 		parser.error("Provide target/variable names or use --all flag")
 
+	if args.evaluate and variables:
+		attach_evaluated_values(variables, Path(args.file), args.eval_cache)
+
 	# Print descriptions
 	use_color: bool = not args.no_color
 	output_lines: list[str] = []
@@ -13,10 +13,16 @@ Tests marked "EXPECTED TO FAIL before fix" verify bugs from the cleanup plan:
 
 from __future__ import annotations
 
+import base64
+import gzip
+import hashlib
+import importlib.util
+import json
 import os
 import re
 import shutil
 import subprocess
+import sys
 from pathlib import Path
 
 import pytest
@@ -108,8 +114,31 @@ def run_make(
 	)
 
 
+def run_script(
+	env: Path,
+	script: str,
+	*args: str,
+) -> subprocess.CompletedProcess[str]:
+	"""Run a helper script from *env*/.meta/scripts/ with the current python.
+
+	>>> run_script(env, "recipe_info.py", "--complete", "dep")
+	"""
+	return subprocess.run(
+		[sys.executable, str(env / ".meta" / "scripts" / script), *args],
+		cwd=env,
+		capture_output=True,
+		text=True,
+		timeout=30,
+		check=False,
+	)
+
+
 _has_ruff = shutil.which("ruff") is not None
 
+_has_docs_deps = all(
+	importlib.util.find_spec(mod) is not None for mod in ("pdoc", "nbconvert")
+)
+
 _GIT_ENV_VARS = {
 	"GIT_AUTHOR_NAME": "Test",
 	"GIT_AUTHOR_EMAIL": "test@test.com",
@@ -355,6 +384,835 @@ class TestDocsClean:
 		assert result.returncode == 0, result.stderr
 		assert not gen_dir.exists(), "generated subdirectory should be removed"
 
+	def test_glob_patterns_recursive(self, make_env: Path) -> None:
+		pyproject = make_env / "pyproject.toml"
+		pyproject.write_text(
+			pyproject.read_text().replace(
+				'".nojekyll",  # For GitHub Pages',
+				'".nojekyll", "*.svg", "assets/**",',
+			)
+		)
+		docs = make_env / "docs"
+		(docs / "a" / "b").mkdir(parents=True)
+		(docs / "a" / "b" / "logo.svg").write_text("<svg/>")
+		(docs / "a" / "b" / "page.html").write_text("<html></html>")
+		(docs / "a" / "gone" / "deeper").mkdir(parents=True)
+		(docs / "a" / "gone" / "deeper" / "x.html").write_text("<html></html>")
+		(docs / "assets" / "js").mkdir(parents=True)
+		(docs / "assets" / "js" / "app.js").write_text("")
+
+		result = run_make(make_env, "docs-clean", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert (docs / "a" / "b" / "logo.svg").exists(), (
+			"*.svg should match at any depth"
+		)
+		assert not (docs / "a" / "b" / "page.html").exists()
+		assert not (docs / "a" / "gone").exists(), (
+			"emptied directories should be removed"
+		)
+		assert (docs / "assets" / "js" / "app.js").exists(), (
+			"assets/** should be preserved"
+		)
+
+	def test_glob_patterns_stay_within_directories(self, make_env: Path) -> None:
+		pyproject = make_env / "pyproject.toml"
+		pyproject.write_text(
+			pyproject.read_text().replace(
+				'".nojekyll",  # For GitHub Pages',
+				'".nojekyll", "guide/**/keep.txt", "a[!x]b",',
+			)
+		)
+		docs = make_env / "docs"
+		(docs / "guide" / "deep" / "er").mkdir(parents=True)
+		(docs / "guide" / "keep.txt").write_text("")
+		(docs / "guide" / "deep" / "er" / "keep.txt").write_text("")
+		(docs / "guide" / "page.html").write_text("<html></html>")
+		(docs / "a" / "b").mkdir(parents=True)
+		(docs / "a" / "b" / "page.html").write_text("<html></html>")
+		(docs / "ayb").write_text("")
+
+		result = run_make(make_env, "docs-clean", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert (docs / "guide" / "keep.txt").exists(), (
+			"`**/` should match no directories too"
+		)
+		assert (docs / "guide" / "deep" / "er" / "keep.txt").exists()
+		assert not (docs / "guide" / "page.html").exists()
+		assert (docs / "ayb").exists()
+		assert not (docs / "a").exists(), "`[!x]` should not match `/`"
+
+	def test_resources_dir_preserved_only_at_its_path(self, make_env: Path) -> None:
+		"""``DOCS_RESOURCES_DIR`` is an exact path, not a glob matching ``resources`` at any depth."""
+		docs = make_env / "docs"
+		(docs / "resources" / "style.css").write_text("p {}")
+		nested = docs / "myproject" / "resources" / "page.html"
+		nested.parent.mkdir(parents=True)
+		nested.write_text("<html></html>")
+
+		result = run_make(make_env, "docs-clean", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert (docs / "resources" / "style.css").exists()
+		assert not (docs / "myproject").exists(), (
+			"a nested `resources` dir is generated"
+		)
+
+	def test_swaps_in_new_generation(self, make_env: Path) -> None:
+		docs = make_env / "docs"
+		(docs / "generated.html").write_text("<html></html>")
+		keep = docs / "resources" / "keep.txt"
+		keep.write_text("preserve me")
+		generation = docs.stat().st_ino
+		inode = keep.stat().st_ino
+
+		result = run_make(make_env, "docs-clean", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert docs.stat().st_ino != generation, (
+			"docs-clean should swap in a new generation"
+		)
+		assert keep.stat().st_ino == inode, "preserved files should be hard-linked"
+		assert not (docs / "generated.html").exists()
+
+	def test_dry_run_removes_nothing(self, make_env: Path) -> None:
+		generated = make_env / "docs" / "sub" / "myproject.html"
+		generated.parent.mkdir(parents=True)
+		generated.write_text("<html></html>")
+		result = run_make(
+			make_env, "docs-clean", RUN_GLOBAL="1", DOCS_CLEAN_ARGS="--dry-run"
+		)
+		assert result.returncode == 0, result.stderr
+		assert generated.exists(), "--dry-run should not remove anything"
+		assert "myproject.html" in result.stdout
+		assert "would remove 2" in result.stdout
+
+
+# ---------------------------------------------------------------------------
+# make docs-html
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def docs_env(make_env: Path) -> Path:
+	"""*make_env* plus the example package, notebooks, and docs templates."""
+	for d in ("myproject", "notebooks", "docs/resources"):
+		shutil.rmtree(make_env / d, ignore_errors=True)
+		shutil.copytree(PROJECT_ROOT / d, make_env / d)
+	return make_env
+
+
+@pytest.mark.skipif(not _has_docs_deps, reason="pdoc/nbconvert not installed")
+class TestDocsHtml:
+	"""Verify ``make docs-html`` (needs pdoc and nbconvert importable by ``python``)."""
+
+	@staticmethod
+	def _read_outputs(env: Path) -> dict[str, bytes]:
+		docs = env / "docs"
+		return {
+			p.relative_to(docs).as_posix(): p.read_bytes()
+			for p in sorted(docs.rglob("*"))
+			if p.is_file() and "resources" not in p.parts
+		}
+
+	def test_generates_module_pages(self, docs_env: Path) -> None:
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert (docs_env / "docs" / "myproject.html").is_file()
+		assert (docs_env / "docs" / "myproject" / "helloworld.html").is_file()
+		assert (docs_env / "docs" / "search" / "manifest.js").is_file()
+		assert (docs_env / "docs" / "search" / "myproject.helloworld.js").is_file()
+		assert not list((docs_env / "docs").rglob("*manifest.json")), (
+			"manifests are not published"
+		)
+
+	def test_parallel_matches_serial(self, docs_env: Path) -> None:
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		serial = self._read_outputs(docs_env)
+
+		# without the manifest, everything is rendered again
+		(docs_env / ".meta" / "local" / "docs" / "docs-manifest.json").unlink()
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1", DOCS_JOBS="2")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 3 of 3 modules" in result.stdout
+		assert self._read_outputs(docs_env) == serial
+
+	def test_incremental_rebuild(self, docs_env: Path) -> None:
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 3 of 3 modules (full rebuild)" in result.stdout
+		helloworld = docs_env / "docs" / "myproject" / "helloworld.html"
+		other = docs_env / "docs" / "myproject" / "other.html"
+		mtime = helloworld.stat().st_mtime_ns
+
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 0 of 3 modules" in result.stdout
+
+		source = docs_env / "myproject" / "other.py"
+		source.write_text(
+			source.read_text().replace('"a module"', '"a changed module"')
+		)
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 1 of 3 modules" in result.stdout
+		assert "a changed module" in other.read_text()
+		assert helloworld.stat().st_mtime_ns == mtime
+		search = docs_env / "docs" / "search"
+		assert "a changed module" in (search / "myproject.other.js").read_text()
+		assert "compiled 1 of 3 search index shards" in result.stdout
+
+	def test_incremental_rebuild_transitive_dependents(self, docs_env: Path) -> None:
+		package = docs_env / "myproject"
+		(package / "chain_a.py").write_text('class A:\n\t"original docstring"\n')
+		(package / "chain_b.py").write_text(
+			"from myproject.chain_a import A\n\n\nclass B(A):\n\tpass\n"
+		)
+		(package / "chain_c.py").write_text(
+			"from myproject.chain_b import B\n\n\nclass C(B):\n\tpass\n"
+		)
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 6 of 6 modules (full rebuild)" in result.stdout
+
+		# `C` inherits its docstring from `A` through `B`
+		(package / "chain_a.py").write_text('class A:\n\t"changed docstring"\n')
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "rendered 3 of 6 modules" in result.stdout
+		assert (
+			"changed docstring"
+			in (docs_env / "docs" / "myproject" / "chain_c.html").read_text()
+		)
+
+	def test_staged_build_swapped_in(self, docs_env: Path) -> None:
+		docs = docs_env / "docs"
+		# make_docs.py stands alone, like every script in SCRIPTS_LIST
+		(docs_env / ".meta" / "scripts" / "docs_clean.py").unlink()
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		helloworld = docs / "myproject" / "helloworld.html"
+		generation = (docs / "myproject").stat().st_ino
+		inode = helloworld.stat().st_ino
+		report = docs / "coverage" / "index.html"
+		report.parent.mkdir()
+		report.write_text("<html></html>")
+		(docs / "search.js").write_text("")
+
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert (docs / "myproject").stat().st_ino != generation, (
+			"build should swap in a new generation"
+		)
+		assert helloworld.stat().st_ino == inode, (
+			"unchanged outputs should be hard-linked"
+		)
+		assert report.is_file(), "files the build doesn't write should be left alone"
+		assert not (docs / "search.js").exists(), (
+			"outputs of older builds should be removed"
+		)
+		assert not (docs_env / ".docs.staging").exists()
+
+	def test_default_search_template_gets_search_js(self, docs_env: Path) -> None:
+		"""Without the sharded search template, pdoc's single ``search.js`` is written."""
+		docs = docs_env / "docs"
+		assert run_make(docs_env, "docs-html", RUN_GLOBAL="1").returncode == 0
+		assert (docs / "search" / "manifest.js").is_file()
+
+		(docs / "resources" / "templates" / "html" / "search.html.jinja2").unlink()
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "myproject.helloworld" in (docs / "search.js").read_text()
+		assert not (docs / "search").exists(), (
+			"shards are not loaded by pdoc's template"
+		)
+
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "search index unchanged" in result.stdout
+		assert (docs / "search.js").is_file()
+
+	def test_notebooks_skip_unchanged_and_prune(self, docs_env: Path) -> None:
+		notebooks = docs_env / "docs" / "notebooks"
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "converting 2 of 2 notebooks" in result.stdout
+		index_mtime = (notebooks / "index.html").stat().st_mtime_ns
+
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "converting 0 of 2 notebooks" in result.stdout
+		assert (notebooks / "index.html").stat().st_mtime_ns == index_mtime
+
+		(docs_env / "notebooks" / "no_desc.ipynb").unlink()
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "converting 0 of 1 notebooks" in result.stdout
+		assert not (notebooks / "no_desc.html").exists()
+		assert "no_desc" not in (notebooks / "index.html").read_text()
+
+	def test_notebooks_parallel_matches_serial(self, docs_env: Path) -> None:
+		notebooks = docs_env / "docs" / "notebooks"
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		serial = {
+			k: v
+			for k, v in self._read_outputs(docs_env).items()
+			if k.startswith("notebooks/")
+		}
+
+		shutil.rmtree(notebooks)
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1", DOCS_JOBS="2")
+		assert result.returncode == 0, result.stderr
+		assert "converting 2 of 2 notebooks" in result.stdout
+		parallel = {
+			k: v
+			for k, v in self._read_outputs(docs_env).items()
+			if k.startswith("notebooks/")
+		}
+		assert parallel == serial
+
+	def test_notebooks_large_outputs_extracted(self, docs_env: Path) -> None:
+		nbformat = pytest.importorskip("nbformat")
+		image_size = 6000
+		cell = nbformat.v4.new_code_cell("plot()")
+		cell.outputs = [
+			nbformat.v4.new_output(
+				"display_data",
+				data={"image/png": base64.b64encode(os.urandom(image_size)).decode()},
+			),
+			nbformat.v4.new_output("stream", name="stdout", text="x" * 9000),
+		]
+		nb = nbformat.v4.new_notebook(cells=[cell])
+		nbformat.write(nb, str(docs_env / "notebooks" / "big.ipynb"))
+		pyproject = docs_env / "pyproject.toml"
+		pyproject.write_text(
+			pyproject.read_text().replace(
+				"# max_output_size = 1_000_000", "max_output_size = 4096"
+			)
+		)
+
+		result = run_make(docs_env, "docs-html", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		notebooks = docs_env / "docs" / "notebooks"
+		assert (
+			notebooks / "big_files" / "cell0_output0.png"
+		).stat().st_size == image_size
+		html = (notebooks / "big.html").read_text()
+		assert 'src="big_files/cell0_output0.png"' in html
+		assert "x" * 9000 not in html
+		assert "output of 9000 characters removed" in html
+
+	def test_combined_markdown_parallel_and_split(self, docs_env: Path) -> None:
+		combined = docs_env / "docs" / "combined"
+		result = run_make(docs_env, "docs-md", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		serial = (combined / "myproject.md").read_bytes()
+
+		result = run_make(docs_env, "docs-md", RUN_GLOBAL="1", DOCS_JOBS="2")
+		assert result.returncode == 0, result.stderr
+		assert (combined / "myproject.md").read_bytes() == serial
+
+		(combined / "myproject.md").unlink()
+		result = run_script(docs_env, "make_docs.py", "--combined", "--split")
+		assert result.returncode == 0, result.stderr
+		assert sorted(p.name for p in combined.glob("*.md")) == [
+			"myproject.helloworld.md",
+			"myproject.md",
+			"myproject.other.md",
+		]
+
+
+class TestDocsCompress:
+	"""Verify ``make docs-compress`` writes and maintains ``.gz`` siblings."""
+
+	def test_compresses_and_skips_up_to_date(self, make_env: Path) -> None:
+		page = make_env / "docs" / "page.html"
+		page.write_text("<p>hello</p>\n" * 100)
+		(make_env / "docs" / "small.css").write_text("p {}")
+		(make_env / "docs" / "data.txt").write_text("x" * 1000)
+
+		result = run_make(make_env, "docs-compress", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "compressed 1 of 1 files" in result.stdout
+		gz = make_env / "docs" / "page.html.gz"
+		assert gzip.decompress(gz.read_bytes()) == page.read_bytes()
+		assert not (make_env / "docs" / "small.css.gz").exists()
+		assert not (make_env / "docs" / "data.txt.gz").exists()
+
+		result = run_make(make_env, "docs-compress", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "compressed 0 of 1 files" in result.stdout
+
+	def test_removes_orphans(self, make_env: Path) -> None:
+		page = make_env / "docs" / "page.html"
+		page.write_text("<p>hello</p>\n" * 100)
+		assert run_make(make_env, "docs-compress", RUN_GLOBAL="1").returncode == 0
+		page.unlink()
+		result = run_make(make_env, "docs-compress", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert not (make_env / "docs" / "page.html.gz").exists()
+
+	def test_leaves_resources_and_no_clean_alone(self, make_env: Path) -> None:
+		"""Committed files in the resources dir and ``no_clean`` paths are neither compressed nor removed."""
+		pyproject = make_env / "pyproject.toml"
+		pyproject.write_text(
+			pyproject.read_text().replace('".nojekyll",', '".nojekyll", "vendor/**",')
+		)
+		docs = make_env / "docs"
+		(docs / "page.html").write_text("<p>hello</p>\n" * 100)
+		(docs / "resources" / "style.css").write_text("p { color: red; }\n" * 100)
+		(docs / "resources" / "logo.svg.gz").write_bytes(b"committed")
+		(docs / "vendor").mkdir()
+		(docs / "vendor" / "lib.js.gz").write_bytes(b"committed")
+
+		result = run_make(make_env, "docs-compress", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "compressed 1 of 1 files" in result.stdout
+		assert (docs / "page.html.gz").is_file()
+		assert not (docs / "resources" / "style.css.gz").exists()
+		assert (docs / "resources" / "logo.svg.gz").read_bytes() == b"committed"
+		assert (docs / "vendor" / "lib.js.gz").read_bytes() == b"committed"
+
+
+# ---------------------------------------------------------------------------
+# pdoc_markdown2_cli.py
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(not _has_docs_deps, reason="pdoc not installed")
+class TestPdocMarkdown2Cli:
+	"""Verify single file and batch conversion in ``pdoc_markdown2_cli.py``."""
+
+	def test_single_file(self, make_env: Path) -> None:
+		(make_env / "page.md").write_text("# Title\n\nsome *text*\n")
+		result = run_script(make_env, "pdoc_markdown2_cli.py", "page.md", "page.html")
+		assert result.returncode == 0, result.stderr
+		assert "<em>text</em>" in (make_env / "page.html").read_text()
+
+	def test_batch_glob_and_skip_up_to_date(self, make_env: Path) -> None:
+		src = make_env / "pages"
+		(src / "sub").mkdir(parents=True)
+		(src / "a.md").write_text("# A\n")
+		(src / "sub" / "b.md").write_text("# B\n")
+		args = ("pages/**/*.md", "--out-dir", "html", "--root", "pages", "--jobs", "2")
+
+		result = run_script(make_env, "pdoc_markdown2_cli.py", *args)
+		assert result.returncode == 0, result.stderr
+		assert "converted 2 of 2 markdown files" in result.stdout
+		assert (make_env / "html" / "sub" / "b.html").is_file()
+
+		result = run_script(make_env, "pdoc_markdown2_cli.py", *args)
+		assert result.returncode == 0, result.stderr
+		assert "converted 0 of 2 markdown files" in result.stdout
+
+	def test_manifest(self, make_env: Path) -> None:
+		(make_env / "a.md").write_text("# A\n")
+		(make_env / "b.md").write_text("# B\n")
+		(make_env / "my page.md").write_text("# C\n")
+		(make_env / "pages.txt").write_text(
+			"# comment\na.md\tout/first.html\nb.md\nmy page.md\tout/my page.html\n"
+		)
+		result = run_script(
+			make_env,
+			"pdoc_markdown2_cli.py",
+			"--manifest",
+			"pages.txt",
+			"--out-dir",
+			"rest",
+		)
+		assert result.returncode == 0, result.stderr
+		assert (make_env / "out" / "first.html").is_file()
+		assert (make_env / "rest" / "b.html").is_file()
+		assert (make_env / "out" / "my page.html").is_file(), "paths may contain spaces"
+
+	def test_options_change_converts_again(self, make_env: Path) -> None:
+		(make_env / "pages").mkdir()
+		(make_env / "pages" / "a.md").write_text("<b>raw</b>\n")
+		args = ("pages/a.md", "--out-dir", "html", "--root", "pages")
+
+		result = run_script(make_env, "pdoc_markdown2_cli.py", *args)
+		assert result.returncode == 0, result.stderr
+		assert "<b>raw</b>" in (make_env / "html" / "a.html").read_text()
+
+		result = run_script(
+			make_env, "pdoc_markdown2_cli.py", *args, "--safe-mode", "escape"
+		)
+		assert result.returncode == 0, result.stderr
+		assert "converted 1 of 1 markdown files" in result.stdout
+		assert "<b>raw</b>" not in (make_env / "html" / "a.html").read_text()
+
+		result = run_script(
+			make_env, "pdoc_markdown2_cli.py", *args, "--safe-mode", "escape"
+		)
+		assert result.returncode == 0, result.stderr
+		assert "converted 0 of 1 markdown files" in result.stdout
+
+
+# ---------------------------------------------------------------------------
+# generate_badge.py
+# ---------------------------------------------------------------------------
+
+
+class TestGenerateBadge:
+	"""Verify ``generate_badge.py`` single badge and manifest modes."""
+
+	def test_generic_badge(self, make_env: Path) -> None:
+		result = run_script(
+			make_env, "generate_badge.py", "--label", "version", "--value", "1.2.3"
+		)
+		assert result.returncode == 0, result.stderr
+		assert "<svg" in result.stdout
+		assert "1.2.3" in result.stdout
+
+	def test_width_from_font_metrics(self, make_env: Path) -> None:
+		# DejaVu Sans 11px: "i"/"l" are 3.1px and "W" is 10.9px wide,
+		# each side rounded up and padded by 10px
+		result = run_script(
+			make_env, "generate_badge.py", "--label", "ill", "--value", "WWW"
+		)
+		assert result.returncode == 0, result.stderr
+		assert 'width="63"' in result.stdout
+		assert '<rect width="20"' in result.stdout
+
+	def test_coverage_json_and_xml(self, make_env: Path) -> None:
+		(make_env / "coverage.json").write_text(
+			'{"totals": {"percent_covered": 87.6, "percent_covered_display": "88"}}'
+		)
+		(make_env / "coverage.xml").write_text(
+			'<?xml version="1.0" ?>\n<coverage lines-valid="200" lines-covered="150"'
+			' branches-valid="40" branches-covered="30" line-rate="0.75"><packages/></coverage>\n'
+		)
+		result = run_script(
+			make_env, "generate_badge.py", "--coverage", "coverage.json"
+		)
+		assert result.returncode == 0, result.stderr
+		assert ">88%<" in result.stdout
+		result = run_script(make_env, "generate_badge.py", "--coverage", "coverage.xml")
+		assert result.returncode == 0, result.stderr
+		assert ">75%<" in result.stdout
+
+	def test_junit_xml(self, make_env: Path) -> None:
+		(make_env / "junit.xml").write_text(
+			'<?xml version="1.0" encoding="utf-8"?>\n<testsuites><testsuite name="pytest">'
+			'<testcase name="a"/><testcase name="b"><failure message="x"/></testcase>'
+			'<testcase name="c"><skipped/></testcase><testcase name="d"/>'
+			"</testsuite></testsuites>\n"
+		)
+		result = run_script(make_env, "generate_badge.py", "--junit-xml", "junit.xml")
+		assert result.returncode == 0, result.stderr
+		assert ">2/4 passed<" in result.stdout
+
+	def test_manifest_skips_unchanged(self, make_env: Path) -> None:
+		(make_env / "coverage.txt").write_text("TOTAL    100    10    90%\n")
+		(make_env / "badges.toml").write_text(
+			"[[badge]]\n"
+			'output = "badges/coverage.svg"\n'
+			'coverage = "coverage.txt"\n'
+			"\n"
+			"[[badge]]\n"
+			'output = "badges/version.svg"\n'
+			'label = "version"\n'
+			'value = "1.2.3"\n'
+			'color = "blue"\n'
+		)
+		result = run_script(make_env, "generate_badge.py", "--manifest", "badges.toml")
+		assert result.returncode == 0, result.stderr
+		assert "wrote 2 of 2 badges" in result.stdout
+		coverage_svg = make_env / "badges" / "coverage.svg"
+		assert "90%" in coverage_svg.read_text()
+		mtime = coverage_svg.stat().st_mtime_ns
+
+		result = run_script(make_env, "generate_badge.py", "--manifest", "badges.toml")
+		assert result.returncode == 0, result.stderr
+		assert "wrote 0 of 2 badges" in result.stdout
+		assert coverage_svg.stat().st_mtime_ns == mtime
+
+	def test_manifest_reports_bad_badge(self, make_env: Path) -> None:
+		(make_env / "badges.toml").write_text(
+			'[[badge]]\noutput = "a.svg"\nlabel = "x"\nvalue = "y"\n\n'
+			'[[badge]]\noutput = "b.svg"\ncoverage = "missing.txt"\n'
+		)
+		result = run_script(make_env, "generate_badge.py", "--manifest", "badges.toml")
+		assert result.returncode == 1
+		assert "badge 1" in result.stderr
+		assert (make_env / "a.svg").is_file()
+
+
+# ---------------------------------------------------------------------------
+# export_requirements.py
+# ---------------------------------------------------------------------------
+
+
+class TestExportRequirements:
+	"""Verify ``export_requirements.py`` builds uv export commands from the config."""
+
+	N_EXPORTS = 5
+	"""exports configured in pyproject.toml"""
+
+	@pytest.fixture
+	def uv_env(self, make_env: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+		"""*make_env* with a fake ``uv`` first on PATH.
+
+		It logs its arguments to ``bin/calls.log``, prints them as the export,
+		and fails for exports with ``--extra`` while ``bin/fail`` exists.
+		"""
+		bin_dir = make_env / "bin"
+		bin_dir.mkdir()
+		uv = bin_dir / "uv"
+		uv.write_text(
+			"#!/bin/sh\n"
+			'bin="$(dirname "$0")"\n'
+			'echo "$*" >> "$bin/calls.log"\n'
+			'case "$*" in *--extra*) [ -e "$bin/fail" ] && { echo "no such extra" >&2; exit 2; } ;; esac\n'
+			'echo "# $*"\n'
+		)
+		uv.chmod(0o755)
+		(make_env / "uv.lock").write_text("version = 1\n")
+		monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+		return make_env
+
+	@staticmethod
+	def _n_calls(env: Path) -> int:
+		calls = env / "bin" / "calls.log"
+		return len(calls.read_text().splitlines()) if calls.is_file() else 0
+
+	def _run(self, env: Path, *args: str) -> subprocess.CompletedProcess[str]:
+		return run_script(
+			env, "export_requirements.py", "pyproject.toml", ".meta/requirements", *args
+		)
+
+	def test_prints_commands(self, make_env: Path) -> None:
+		result = run_script(
+			make_env, "export_requirements.py", "pyproject.toml", ".meta/requirements"
+		)
+		assert result.returncode == 0, result.stderr
+		lines = result.stdout.splitlines()
+		assert (
+			"uv export --no-hashes --no-group dev --no-group lint > .meta/requirements/requirements-base.txt"
+			in lines
+		)
+		assert (
+			"uv export --no-hashes --group dev --group lint --extra cli > .meta/requirements/requirements.txt"
+			in lines
+		)
+
+	def test_run_skips_up_to_date(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		assert "exported 5 of 5 requirements files, 0 up to date" in result.stdout
+		requirements = uv_env / ".meta" / "requirements" / "requirements.txt"
+		assert requirements.read_text().startswith("# export")
+		assert self._n_calls(uv_env) == self.N_EXPORTS
+
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		assert "exported 0 of 5 requirements files, 5 up to date" in result.stdout
+		assert self._n_calls(uv_env) == self.N_EXPORTS
+
+		requirements.unlink()
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		assert "exported 1 of 5 requirements files, 4 up to date" in result.stdout
+		assert requirements.is_file()
+
+	def test_run_after_lock_change(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+
+		(uv_env / "uv.lock").write_text("version = 2\n")
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		assert "exported 5 of 5 requirements files, 0 up to date" in result.stdout
+		assert self._n_calls(uv_env) == 2 * self.N_EXPORTS
+
+	def test_run_force(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+
+		result = self._run(uv_env, "--run", "--force")
+		assert result.returncode == 0, result.stderr
+		assert "exported 5 of 5 requirements files" in result.stdout
+		assert self._n_calls(uv_env) == 2 * self.N_EXPORTS
+
+	def test_run_failed_export_not_recorded(self, uv_env: Path) -> None:
+		(uv_env / "bin" / "fail").touch()
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 1
+		assert "failed to export requirements.txt" in result.stderr
+		assert "no such extra" in result.stderr
+		hashes = json.loads(
+			(uv_env / ".meta" / "requirements" / ".export-hashes.json").read_text()
+		)
+		assert "requirements.txt" not in hashes
+		assert "requirements-base.txt" in hashes
+
+		(uv_env / "bin" / "fail").unlink()
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		assert "exported 1 of 5 requirements files, 4 up to date" in result.stdout
+
+	def test_check_matching(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		n_calls = self._n_calls(uv_env)
+
+		result = self._run(uv_env, "--check")
+		assert result.returncode == 0, result.stderr
+		assert (
+			"all 5 requirements files in '.meta/requirements' are up to date"
+			in result.stdout
+		)
+		assert self._n_calls(uv_env) == n_calls + self.N_EXPORTS, (
+			"--check always exports"
+		)
+
+	def test_check_differing(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		requirements = uv_env / ".meta" / "requirements" / "requirements.txt"
+		requirements.write_text("stale\n")
+
+		result = self._run(uv_env, "--check")
+		assert result.returncode == 1
+		assert "+++ .meta/requirements/requirements.txt (exported)" in result.stdout
+		assert "-stale" in result.stdout
+		assert "run `make dep` to update them" in result.stderr
+
+	def test_check_missing(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		(uv_env / ".meta" / "requirements" / "requirements-base.txt").unlink()
+
+		result = self._run(uv_env, "--check")
+		assert result.returncode == 1
+		assert "--- /dev/null" in result.stdout
+		assert (
+			"+++ .meta/requirements/requirements-base.txt (exported)" in result.stdout
+		)
+
+	def test_check_stray_file(self, uv_env: Path) -> None:
+		result = self._run(uv_env, "--run")
+		assert result.returncode == 0, result.stderr
+		(uv_env / ".meta" / "requirements" / "requirements-old.txt").write_text("")
+
+		result = self._run(uv_env, "--check")
+		assert result.returncode == 1
+		assert (
+			".meta/requirements/requirements-old.txt is not written by any export"
+			in result.stdout
+		)
+
+	def test_dep_check_runs_without_syncing(self, make_env: Path) -> None:
+		result = run_make(make_env, "-n", "dep-check")
+		assert result.returncode == 0, result.stderr
+		assert (
+			"uv run --no-sync python .meta/scripts/export_requirements.py"
+			in result.stdout
+		)
+		result = run_make(make_env, "-n", "setup")
+		assert result.returncode == 0, result.stderr
+		assert "--check" not in result.stdout, "setup should not run dep-check"
+
+
+# ---------------------------------------------------------------------------
+# make self-setup-scripts
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.skipif(shutil.which("curl") is None, reason="curl not installed")
+class TestSelfSetupScripts:
+	"""Verify ``self-setup-scripts`` works offline, from a local checkout or the cache."""
+
+	def test_file_url(self, make_env: Path) -> None:
+		shutil.rmtree(make_env / ".meta" / "scripts")
+		result = run_make(
+			make_env,
+			"self-setup-scripts",
+			SCRIPTS_URL_BASE=(PROJECT_ROOT / "scripts" / "out").as_uri(),
+		)
+		assert result.returncode == 0, result.stderr
+		for script in (PROJECT_ROOT / "scripts" / "out").glob("*.py"):
+			copied = make_env / ".meta" / "scripts" / script.name
+			assert copied.read_bytes() == script.read_bytes()
+
+	def test_verified_scripts_kept(self, make_env: Path) -> None:
+		url = (PROJECT_ROOT / "scripts" / "out").as_uri()
+		scripts = make_env / ".meta" / "scripts"
+		result = run_make(make_env, "self-setup-scripts", SCRIPTS_URL_BASE=url)
+		assert result.returncode == 0, result.stderr
+		assert "0 fetched" in result.stdout
+
+		(scripts / "get_version.py").write_text("# tampered\n")
+		result = run_make(make_env, "self-setup-scripts", SCRIPTS_URL_BASE=url)
+		assert result.returncode == 0, result.stderr
+		assert "1 fetched" in result.stdout
+		assert (scripts / "get_version.py").read_bytes() == (
+			PROJECT_ROOT / "scripts" / "out" / "get_version.py"
+		).read_bytes()
+
+	def test_mismatched_download_rejected(self, make_env: Path) -> None:
+		upstream = make_env / "upstream"
+		shutil.copytree(PROJECT_ROOT / "scripts" / "out", upstream)
+		with (upstream / "get_todos.py").open("a") as f:
+			f.write("# not what the manifest says\n")
+		(make_env / ".meta" / "scripts" / "get_todos.py").unlink()
+		result = run_make(
+			make_env, "self-setup-scripts", SCRIPTS_URL_BASE=upstream.as_uri()
+		)
+		assert result.returncode != 0
+		assert "get_todos.py does not match MANIFEST.json" in result.stderr
+		assert not (make_env / ".meta" / "scripts" / "get_todos.py").exists()
+
+	@staticmethod
+	def _fill_cache(cache: Path) -> dict[str, str]:
+		"""Cache every script under its sha256, like a previous download would."""
+		out = PROJECT_ROOT / "scripts" / "out"
+		cache.mkdir()
+		shutil.copy(out / "MANIFEST.json", cache / "MANIFEST.json")
+		hashes: dict[str, str] = json.loads((out / "MANIFEST.json").read_text())[
+			"sha256"
+		]
+		for name, digest in hashes.items():
+			shutil.copy(out / name, cache / f"{digest}.py")
+		return hashes
+
+	def test_cache_used_first(self, make_env: Path) -> None:
+		cache = make_env / "cache"
+		hashes = self._fill_cache(cache)
+		shutil.rmtree(make_env / ".meta" / "scripts")
+		# nothing listens on port 9, so any download would fail
+		offline = dict(
+			SCRIPTS_VERSION="v0.0.0",
+			SCRIPTS_CACHE_DIR=str(cache),
+			SCRIPTS_URL_BASE="http://127.0.0.1:9/scripts/out",
+		)
+		result = run_make(make_env, "self-setup-scripts", **offline)
+		assert result.returncode == 0, result.stderr
+		assert "using the cached one" in result.stderr
+		assert "0 fetched" in result.stdout
+		assert (make_env / ".meta" / "scripts" / "get_version.py").is_file()
+
+		(cache / f"{hashes['get_version.py']}.py").write_text("# stale\n")
+		(make_env / ".meta" / "scripts" / "get_version.py").unlink()
+		result = run_make(make_env, "self-setup-scripts", **offline)
+		assert result.returncode != 0
+		assert "failed to fetch get_version.py" in result.stderr
+
+	def test_cache_not_used_without_manifest(self, make_env: Path) -> None:
+		"""Cached scripts can't be verified without a manifest, so they are fetched again."""
+		cache = make_env / "cache"
+		self._fill_cache(cache)
+		(cache / "MANIFEST.json").unlink()
+		result = run_make(
+			make_env,
+			"self-setup-scripts",
+			SCRIPTS_VERSION="v0.0.0",
+			SCRIPTS_CACHE_DIR=str(cache),
+			SCRIPTS_URL_BASE="http://127.0.0.1:9/scripts/out",
+		)
+		assert result.returncode != 0
+		assert "scripts will not be verified" in result.stderr
+		assert "failed to fetch" in result.stderr
+
 
 # ---------------------------------------------------------------------------
 # make dep-clean
@@ -707,6 +1565,61 @@ class TestGenCommitLog:
 		content = log_file.read_text()
 		assert "newfile" in content.lower() or "add" in content.lower()
 
+	def test_grouped_and_json(self, commit_log_env: Path) -> None:
+		result = run_make(
+			commit_log_env,
+			"--eval=write-proj-version: ;",
+			"gen-commit-log",
+			RUN_GLOBAL="1",
+			COMMIT_LOG_ARGS="--group --json",
+		)
+		assert result.returncode == 0, result.stderr
+		local = commit_log_env / ".meta" / "local"
+		assert (local / ".commit_log").read_text().startswith("Other:\n- add newfile (")
+		(record,) = json.loads((local / ".commit_log.json").read_text())
+		assert record["subject"] == "add newfile"
+		assert record["type"] == "other"
+		assert not (local / ".commit_types.json").exists(), (
+			"the overrides are only read"
+		)
+
+		# commits can be reclassified by hand, type, scope, and breaking together
+		(local / ".commit_types.json").write_text(
+			json.dumps({record["hash"]: "feat(api)!"})
+		)
+		run_make(
+			commit_log_env,
+			"--eval=write-proj-version: ;",
+			"gen-commit-log",
+			RUN_GLOBAL="1",
+			COMMIT_LOG_ARGS="--group --json",
+		)
+		assert (
+			(local / ".commit_log").read_text().startswith("Features:\n- add newfile (")
+		)
+		(record,) = json.loads((local / ".commit_log.json").read_text())
+		assert (record["type"], record["scope"], record["breaking"]) == (
+			"feat",
+			"api",
+			True,
+		)
+
+	def test_git_failure_keeps_previous_log(self, commit_log_env: Path) -> None:
+		local = commit_log_env / ".meta" / "local"
+		(local / ".commit_log").write_text("previous log")
+		(local / ".commit_log.json").write_text("[]")
+		result = run_script(
+			commit_log_env,
+			"get_commit_log.py",
+			"v9.9.9",
+			".meta/local/.commit_log",
+			"--json",
+		)
+		assert result.returncode == 1
+		assert (local / ".commit_log").read_text() == "previous log"
+		assert (local / ".commit_log.json").read_text() == "[]"
+		assert not list(local.glob("*.tmp")), "temp files should be removed"
+
 	def test_fails_when_last_version_is_null(self, git_env: Path) -> None:
 		lastver = git_env / ".meta" / "versions" / ".lastversion"
 		if lastver.exists():
@@ -934,6 +1847,184 @@ class TestHelp:
 		assert "not found" in result.stderr.lower()
 
 
+class TestRecipeInfoEvaluate:
+	"""Verify ``recipe_info.py --evaluate`` expanded variable values."""
+
+	CACHE = Path(".meta") / "local" / "recipe_info_values.json"
+
+	def test_help_shows_expanded_value(self, make_env: Path) -> None:
+		"""``make help=VAR`` expands references to other variables."""
+		result = run_make(make_env, help="DOCS_RESOURCES_DIR")
+		assert result.returncode == 0, result.stderr
+		assert "$(DOCS_DIR)/resources" in result.stdout
+		assert "docs/resources" in result.stdout.replace("$(DOCS_DIR)/resources", "")
+
+	def test_evaluate_respects_command_line_overrides(self, make_env: Path) -> None:
+		result = run_make(make_env, help="PYTHON", RUN_GLOBAL="1")
+		assert result.returncode == 0, result.stderr
+		assert "value:" in result.stdout
+		assert "uv run" not in result.stdout.split("value:")[1]
+
+	def test_evaluate_writes_cache_without_environment(self, make_env: Path) -> None:
+		result = run_script(
+			make_env, "recipe_info.py", "--evaluate", "--no-color", "DOCS_DIR"
+		)
+		assert result.returncode == 0, result.stderr
+		values = json.loads((make_env / self.CACHE).read_text())["values"]
+		assert values["DOCS_DIR"] == "docs"
+		assert "PATH" not in values
+
+	def test_evaluate_expands_functions_and_environment(self, make_env: Path) -> None:
+		"""Function calls are expanded by make, and the cache follows the environment."""
+
+		def evaluate(xdg_cache_home: str) -> str:
+			result = subprocess.run(
+				[
+					sys.executable,
+					str(make_env / ".meta" / "scripts" / "recipe_info.py"),
+					"--evaluate",
+					"--no-color",
+					"SCRIPTS_CACHE_DIR",
+				],
+				cwd=make_env,
+				capture_output=True,
+				text=True,
+				timeout=30,
+				check=False,
+				env={**os.environ, "XDG_CACHE_HOME": xdg_cache_home},
+			)
+			assert result.returncode == 0, result.stderr
+			assert "make info-long" not in result.stdout, (
+				"the hint is only for unknown values"
+			)
+			return result.stdout.split("value:")[1].split()[0]
+
+		assert evaluate("/xdg/one") == "/xdg/one/makefile-template/main"
+		assert evaluate("/xdg/two") == "/xdg/two/makefile-template/main"
+
+	def test_cache_kept_across_help_variables(self, make_env: Path) -> None:
+		"""``help=X`` reaches us in ``MAKEFLAGS``, but must not invalidate the cache."""
+		for name in ("DOCS_DIR", "PYTHON_BASE"):
+			result = run_make(make_env, help=name)
+			assert result.returncode == 0, result.stderr
+		values = json.loads((make_env / self.CACHE).read_text())["values"]
+		assert values["DOCS_DIR"] == "docs"
+		assert values["PYTHON_BASE"] == "python"
+
+	def test_cache_invalidated_on_makefile_change(self, make_env: Path) -> None:
+		run_script(make_env, "recipe_info.py", "--evaluate", "DOCS_DIR")
+		makefile = make_env / "makefile"
+		makefile.write_text(
+			makefile.read_text().replace("DOCS_DIR := docs", "DOCS_DIR := site", 1)
+		)
+		result = run_script(
+			make_env,
+			"recipe_info.py",
+			"--evaluate",
+			"--no-color",
+			"COVERAGE_REPORTS_DIR",
+		)
+		assert result.returncode == 0, result.stderr
+		assert "value: site/coverage" in result.stdout
+
+
+class TestRecipeInfoComplete:
+	"""Verify the ``recipe_info.py --complete`` shell completion backend."""
+
+	INDEX = Path(".meta") / "local" / "recipe_info_index.tsv"
+
+	def test_complete_filters_by_prefix(self, make_env: Path) -> None:
+		result = run_script(make_env, "recipe_info.py", "--complete", "dep")
+		assert result.returncode == 0, result.stderr
+		words = [line.split("\t")[0] for line in result.stdout.splitlines()]
+		assert "dep" in words
+		assert "dep-check" in words
+		assert all(w.startswith("dep") for w in words)
+
+	def test_complete_variables_with_equals(self, make_env: Path) -> None:
+		result = run_script(make_env, "recipe_info.py", "--complete", "PACKAGE_")
+		assert result.returncode == 0, result.stderr
+		assert result.stdout.startswith("PACKAGE_NAME=\t")
+
+	def test_complete_writes_index(self, make_env: Path) -> None:
+		run_script(make_env, "recipe_info.py", "--complete", "")
+		index = make_env / self.INDEX
+		assert index.is_file()
+		assert any(
+			line.startswith("clean\t") for line in index.read_text().splitlines()
+		)
+
+	def test_index_rebuilt_when_makefile_changes(self, make_env: Path) -> None:
+		run_script(make_env, "recipe_info.py", "--complete", "")
+		makefile = make_env / "makefile"
+		makefile.write_text(
+			makefile.read_text()
+			+ "\n\n\n# a brand new target\n.PHONY: zzz-new\nzzz-new:\n\t@echo hi\n"
+		)
+		result = run_script(make_env, "recipe_info.py", "--complete", "zzz")
+		assert result.returncode == 0, result.stderr
+		assert result.stdout == "zzz-new\ta brand new target\n"
+
+	@pytest.mark.skipif(shutil.which("bash") is None, reason="bash not installed")
+	def test_bash_completion_checks_index_makefile(self, make_env: Path) -> None:
+		"""An index built from one makefile must not be used to complete another."""
+		(make_env / "other.mk").write_text(
+			"# only in other.mk\n.PHONY: zzz-other\nzzz-other:\n\t@echo hi\n"
+		)
+		run_script(make_env, "recipe_info.py", "--complete", "")
+		assert (make_env / self.INDEX).stat().st_mtime > (
+			make_env / "other.mk"
+		).stat().st_mtime
+		script = run_script(make_env, "recipe_info.py", "--completion-script", "bash")
+		result = subprocess.run(
+			[
+				"bash",
+				"-c",
+				script.stdout
+				+ 'COMP_WORDS=(make -f other.mk zzz); COMP_CWORD=3; _recipe_info_make; printf "%s\\n" "${COMPREPLY[@]}"',
+			],
+			cwd=make_env,
+			capture_output=True,
+			text=True,
+			timeout=30,
+			check=False,
+			env={**os.environ, "RECIPE_INFO_PYTHON": sys.executable},
+		)
+		assert result.stdout.split() == ["zzz-other"], result.stderr
+
+	@pytest.mark.skipif(shutil.which("zsh") is None, reason="zsh not installed")
+	def test_zsh_completion_reads_file_option(self, make_env: Path) -> None:
+		(make_env / "other.mk").write_text(
+			"# only in other.mk\n.PHONY: zzz-other\nzzz-other:\n\t@echo hi\n"
+		)
+		script = run_script(make_env, "recipe_info.py", "--completion-script", "zsh")
+		# stand-ins for the completion system, `_describe` prints the candidates
+		stubs = 'compdef() { :; }\n_describe() { printf "%s\\n" "${(@P)4}"; }\n'
+		result = subprocess.run(
+			[
+				"zsh",
+				"-c",
+				stubs
+				+ script.stdout
+				+ "words=(make --file other.mk zzz); CURRENT=4; _recipe_info_make",
+			],
+			cwd=make_env,
+			capture_output=True,
+			text=True,
+			timeout=30,
+			check=False,
+			env={**os.environ, "RECIPE_INFO_PYTHON": sys.executable},
+		)
+		assert "zzz-other:only in other.mk" in result.stdout.splitlines(), result.stderr
+
+	@pytest.mark.parametrize("shell", ["bash", "zsh"])
+	def test_completion_script_calls_complete(self, make_env: Path, shell: str) -> None:
+		result = run_script(make_env, "recipe_info.py", "--completion-script", shell)
+		assert result.returncode == 0, result.stderr
+		assert "--complete" in result.stdout
+		assert self.INDEX.as_posix() in result.stdout
+
+
 # ---------------------------------------------------------------------------
 # make verify-git
 # ---------------------------------------------------------------------------
@@ -1186,6 +2277,70 @@ class TestAssembly:
 			"run `python scripts/assemble.py`"
 		)
 
+	def test_check_mode(self) -> None:
+		"""`assemble.py --check` should pass on the committed tree, and write nothing."""
+		mtime = self.BUILT.stat().st_mtime_ns
+		result = subprocess.run(
+			[sys.executable, "scripts/assemble.py", "--check"],
+			cwd=PROJECT_ROOT,
+			capture_output=True,
+			text=True,
+			timeout=30,
+			check=False,
+		)
+		assert result.returncode == 0, result.stderr
+		assert "up to date" in result.stdout
+		assert self.BUILT.stat().st_mtime_ns == mtime
+
+	def test_manifest_hashes(self) -> None:
+		"""scripts/out/MANIFEST.json should have the sha256 of every assembled script."""
+		out = PROJECT_ROOT / "scripts" / "out"
+		manifest = json.loads((out / "MANIFEST.json").read_text())
+		assert manifest["version"] == _read_pyproject_version(PROJECT_ROOT)
+		assert manifest["sha256"] == {
+			path.name: hashlib.sha256(path.read_bytes()).hexdigest()
+			for path in sorted(out.glob("*.py"))
+		}
+
+	def test_placeholders_and_set(self, tmp_path: Path) -> None:
+		"""Any ##[[NAME]]## is filled from pyproject.toml or --set, unknown ones are reported."""
+		(tmp_path / "pyproject.toml").write_text(
+			'[project]\nversion = "1.2.3"\n\n'
+			'[tool.makefile.assemble.variables]\nREPO = "some/repo"\n'
+		)
+		(tmp_path / "makefile.template").write_text(
+			"##[[VERSION]]##\n# ##[[REPO]]## ##[[BRANCH]]##\n"
+		)
+		(tmp_path / "scripts" / "make").mkdir(parents=True)
+		(tmp_path / "scripts" / "make" / "x.py").write_text("# ##[[VERSION]]##\n")
+		assemble = [sys.executable, str(PROJECT_ROOT / "scripts" / "assemble.py")]
+
+		result = subprocess.run(
+			assemble,
+			cwd=tmp_path,
+			capture_output=True,
+			text=True,
+			timeout=30,
+			check=False,
+		)
+		assert result.returncode == 1
+		assert "makefile.template: unknown placeholder ##[[BRANCH]]##" in result.stderr
+		assert not (tmp_path / "makefile").exists()
+		assert (tmp_path / "scripts" / "out" / "x.py").read_text() == "# 1.2.3\n"
+
+		result = subprocess.run(
+			[*assemble, "--set", "BRANCH=main", "--set", "VERSION=2.0.0"],
+			cwd=tmp_path,
+			capture_output=True,
+			text=True,
+			timeout=30,
+			check=False,
+		)
+		assert result.returncode == 0, result.stderr
+		assert (tmp_path / "makefile").read_text().splitlines()[1] == "# some/repo main"
+		assert "v2.0.0" in (tmp_path / "makefile").read_text()
+		assert (tmp_path / ".meta" / "scripts" / "x.py").read_text() == "# 2.0.0\n"
+
 
 # ---------------------------------------------------------------------------
 # verify-git quoting